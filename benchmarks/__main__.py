@@ -0,0 +1,163 @@
+"""
+Benchmarks of the main endpoints on a synthetic data set.
+
+    python -m benchmarks seed --directions 10
+    python -m benchmarks run --iterations 50 --scenario unload_map --scenario load_map
+    python -m benchmarks serialization --blocks 300
+    python -m benchmarks importtime --repeat 5
+
+The run command seeds a fresh data set into the DATABASE_URL database, runs the scenarios through
+the application in-process and writes the results to benchmarks/results/<timestamp>.json.
+The serialization command compares ways of rendering a map unload response and needs no database.
+The importtime command measures the cold import of the application and exits with status 1
+if a module is over its budget or a lazily imported module is loaded at startup.
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+from dataclasses import asdict, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from fastapi.testclient import TestClient
+from src.database import engine, SessionLocal
+from src.main import app
+from .generator import GeneratorConfig, seed_database
+from .importtime import measure_import, best_of, check_budgets
+from .scenarios import build_scenarios, run_scenario
+from .serialization import run_serialization_benchmark
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _add_generator_arguments(parser: argparse.ArgumentParser) -> None:
+    for f in fields(GeneratorConfig):
+        parser.add_argument(f'--{f.name.replace("_", "-")}', type=int, default=f.default)
+
+
+def _generator_config(args: argparse.Namespace) -> GeneratorConfig:
+    return GeneratorConfig(**{f.name: getattr(args, f.name) for f in fields(GeneratorConfig)})
+
+
+def seed(args: argparse.Namespace) -> None:
+    with SessionLocal() as session:
+        data = seed_database(session, _generator_config(args))
+    print(f'Data set {data.tag}: directions {data.direction_ids}')
+
+
+def run(args: argparse.Namespace) -> None:
+    started_at = datetime.now(timezone.utc)
+    config = _generator_config(args)
+    with SessionLocal() as session:
+        data = seed_database(session, config)
+
+    scenarios = build_scenarios(config)
+    if args.scenario:
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.scenario]
+
+    results = []
+    with TestClient(app) as client:
+        for scenario in scenarios:
+            result = run_scenario(client, scenario, data, args.iterations, args.warmup)
+            results.append(result)
+            print(
+                f'{result.name:<20} p50 {result.p50_ms:>9.2f} ms  p99 {result.p99_ms:>9.2f} ms  '
+                f'queries {result.queries_p50:>6}  peak {result.peak_memory_kb:>9.1f} KiB'
+            )
+
+    _write_results(args, started_at, {
+        'config': asdict(config),
+        'data_set': data.tag,
+        'results': [asdict(result) for result in results]
+    })
+
+
+def serialization(args: argparse.Namespace) -> None:
+    started_at = datetime.now(timezone.utc)
+    results = run_serialization_benchmark(args.blocks, args.repeat)
+    for result in results:
+        print(f'{result["name"]:<36} median {result["median_ms"]:>8.3f} ms  min {result["min_ms"]:>8.3f} ms')
+    _write_results(args, started_at, {'benchmark': 'serialization', 'results': results})
+
+
+def importtime(args: argparse.Namespace) -> None:
+    started_at = datetime.now(timezone.utc)
+    timings = best_of([measure_import(args.module) for _ in range(args.repeat)])
+    top = sorted(timings.values(), key=lambda t: t.self_ms, reverse=True)[:args.top]
+    for timing in top:
+        print(f'{timing.module:<60} self {timing.self_ms:>8.1f} ms  cumulative {timing.cumulative_ms:>8.1f} ms')
+
+    violations = check_budgets(timings)
+    _write_results(args, started_at, {
+        'benchmark': 'importtime',
+        'module': args.module,
+        'total_ms': timings[args.module].cumulative_ms,
+        'violations': violations,
+        'results': [asdict(timing) for timing in top]
+    })
+    if violations:
+        print('Import budget exceeded:\n  ' + '\n  '.join(violations))
+        sys.exit(1)
+
+
+def _write_results(args: argparse.Namespace, started_at: datetime, payload: dict) -> None:
+    output = Path(args.output) if args.output else RESULTS_DIR / f'{started_at:%Y%m%dT%H%M%SZ}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'started_at': started_at.isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        **payload
+    }, ensure_ascii=False, indent=2))
+    print(f'Results written to {output}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    subparsers = parser.add_subparsers(required=True)
+
+    seed_parser = subparsers.add_parser('seed', help='fill the database with a synthetic data set')
+    _add_generator_arguments(seed_parser)
+    seed_parser.set_defaults(handler=seed)
+
+    run_parser = subparsers.add_parser('run', help='seed a data set and run the scenarios')
+    _add_generator_arguments(run_parser)
+    run_parser.add_argument('--iterations', type=int, default=20)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--scenario', action='append', help='run only the named scenario (repeatable)')
+    run_parser.add_argument('--output', help='path of the JSON file with results')
+    run_parser.set_defaults(handler=run)
+
+    serialization_parser = subparsers.add_parser('serialization', help='compare map unload serialization paths')
+    serialization_parser.add_argument('--blocks', type=int, default=300)
+    serialization_parser.add_argument('--repeat', type=int, default=50)
+    serialization_parser.add_argument('--output', help='path of the JSON file with results')
+    serialization_parser.set_defaults(handler=serialization)
+
+    importtime_parser = subparsers.add_parser('importtime', help='check the cold import time of the application')
+    importtime_parser.add_argument('--module', default='src.main')
+    importtime_parser.add_argument('--repeat', type=int, default=3)
+    importtime_parser.add_argument('--top', type=int, default=20, help='number of the slowest modules to report')
+    importtime_parser.add_argument('--output', help='path of the JSON file with results')
+    importtime_parser.set_defaults(handler=importtime)
+
+    args = parser.parse_args()
+    # журнал SQL мешает читать результаты и искажает время
+    engine.echo = False
+    logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import random
+import uuid
+from dataclasses import dataclass, field
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from src.educational_levels.model import EducationalLevel
+from src.educational_forms.model import EducationalForm
+from src.directions.model import Direction
+from src.departments.model import Department
+from src.control_types.model import ControlType
+from src.competency_groups.model import CompetencyGroup
+from src.competencies.model import Competency
+from src.disciplines.model import Discipline
+from src.map_cors.model import MapCore
+from src.direction_map_cors.model import DirectionMapCore
+from src.discipline_blocks.model import DisciplineBlock
+from src.discipline_block_competencies.model import DisciplineBlockCompetency
+
+CONTROL_TYPES = ('Экзамен', 'Зачет', 'Дифференцированный зачет')
+
+
+@dataclass
+class GeneratorConfig:
+    directions: int = 5
+    map_cors_per_direction: int = 3
+    blocks_per_map_core: int = 40
+    disciplines: int = 300
+    competencies: int = 100
+    competencies_per_block: int = 3
+    departments: int = 10
+    competency_groups: int = 5
+    semesters: int = 8
+    seed: int = 0
+
+
+@dataclass
+class SeededData:
+    tag: str
+    direction_ids: list[int] = field(default_factory=list)
+    # идентификатор вида контроля -> название без метки набора данных
+    control_types: dict[int, str] = field(default_factory=dict)
+    # направление -> тело запроса load_map, соответствующее сгенерированному плану
+    plans: dict[int, dict] = field(default_factory=dict)
+
+
+def _insert(session: Session, model, rows: list[dict]) -> list[int]:
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(session.execute(stmt, rows).scalars())
+
+
+def seed_database(session: Session, config: GeneratorConfig) -> SeededData:
+    """
+    Fill the database with a synthetic data set: reference tables, directions and their educational maps.
+    Control types are reused by name; other unique names are suffixed with a random tag, so several data sets can coexist in one database;
+    the plan contents depend only on config.seed.
+    """
+    rnd = random.Random(config.seed)
+    data = SeededData(tag=uuid.uuid4().hex[:4])
+    tag = data.tag
+
+    level_id, = _insert(session, EducationalLevel, [{'name': f'Бакалавриат {tag}'}])
+    form_id, = _insert(session, EducationalForm, [{'name': f'Очная {tag}'}])
+
+    department_ids = _insert(session, Department, [
+        {'name': f'Кафедра {i} {tag}', 'short_name': f'K{tag}{i}'} for i in range(config.departments)
+    ])
+
+    # виды контроля используются выгрузкой в Excel и валидацией по названию, поэтому берем существующие
+    existing = dict(session.execute(
+        select(ControlType.name, ControlType.id).where(ControlType.name.in_(CONTROL_TYPES))
+    ).all())
+    missing = [name for name in CONTROL_TYPES if name not in existing]
+    if missing:
+        existing.update(zip(missing, _insert(session, ControlType, [{'name': name} for name in missing])))
+    data.control_types = {existing[name]: name for name in CONTROL_TYPES}
+    control_type_ids = list(data.control_types)
+
+    group_ids = _insert(session, CompetencyGroup, [
+        {'name': f'Группа компетенций {i} {tag}'} for i in range(config.competency_groups)
+    ])
+    competency_ids = _insert(session, Competency, [
+        {
+            'code': f'{tag}-{i}',
+            'name': f'Компетенция {i}',
+            'description': f'Способен решать задачи профессиональной деятельности №{i}',
+            'competency_group_id': rnd.choice(group_ids)
+        }
+        for i in range(config.competencies)
+    ])
+    discipline_ids = _insert(session, Discipline, [
+        {'name': f'Дисциплина {i} {tag}', 'short_name': f'Д{i}-{tag}', 'department_id': rnd.choice(department_ids)}
+        for i in range(config.disciplines)
+    ])
+
+    data.direction_ids = _insert(session, Direction, [
+        {
+            'name': f'Направление {i} {tag}',
+            'educational_level_id': level_id,
+            'educational_form_id': form_id,
+            'semester_count': config.semesters
+        }
+        for i in range(config.directions)
+    ])
+
+    map_cors_count = config.directions * config.map_cors_per_direction
+    map_core_ids = _insert(session, MapCore, [
+        {'name': f'Ядро {i} {tag}', 'semesters_count': config.semesters} for i in range(map_cors_count)
+    ])
+    _insert(session, DirectionMapCore, [
+        {'direction_id': direction_id, 'map_core_id': map_core_ids[i * config.map_cors_per_direction + j]}
+        for i, direction_id in enumerate(data.direction_ids)
+        for j in range(config.map_cors_per_direction)
+    ])
+
+    blocks = []
+    block_competencies = []
+    for map_core_id in map_core_ids:
+        for _ in range(config.blocks_per_map_core):
+            lecture_hours, practice_hours, lab_hours = (rnd.randrange(0, 64, 2) for _ in range(3))
+            blocks.append({
+                'discipline_id': rnd.choice(discipline_ids),
+                'credit_units': rnd.randint(1, 8),
+                'control_type_id': rnd.choice(control_type_ids),
+                'lecture_hours': lecture_hours,
+                'practice_hours': practice_hours,
+                'lab_hours': lab_hours,
+                'semester_number': rnd.randint(1, config.semesters),
+                'map_core_id': map_core_id
+            })
+            block_competencies.append(
+                rnd.sample(competency_ids, min(config.competencies_per_block, len(competency_ids)))
+            )
+
+    block_ids = _insert(session, DisciplineBlock, blocks)
+    _insert(session, DisciplineBlockCompetency, [
+        {'discipline_block_id': block_id, 'competency_id': competency_id}
+        for block_id, competencies in zip(block_ids, block_competencies)
+        for competency_id in competencies
+    ])
+    session.commit()
+
+    blocks_by_map_core: dict[int, list[dict]] = {}
+    for block, competencies in zip(blocks, block_competencies):
+        blocks_by_map_core.setdefault(block['map_core_id'], []).append({
+            **{key: value for key, value in block.items() if key != 'map_core_id'},
+            'competencies': [{'id': competency_id} for competency_id in competencies]
+        })
+    for i, direction_id in enumerate(data.direction_ids):
+        first = i * config.map_cors_per_direction
+        data.plans[direction_id] = {
+            'direction_id': direction_id,
+            'map_cors': [
+                {
+                    'id': map_core_ids[j],
+                    'name': f'Ядро {j} {tag}',
+                    'semesters_count': config.semesters,
+                    'discipline_blocks': blocks_by_map_core.get(map_core_ids[j], [])
+                }
+                for j in range(first, first + config.map_cors_per_direction)
+            ]
+        }
+
+    return data
+
+
+def build_validation_request(data: SeededData, direction_id: int, semesters: int) -> list[dict]:
+    """Build the validate-up request body (one row per map core) from the generated plan of the direction."""
+    rows = []
+    for map_core in data.plans[direction_id]['map_cors']:
+        semester_disciplines = [[] for _ in range(semesters)]
+        for block in map_core['discipline_blocks']:
+            semester_disciplines[block['semester_number'] - 1].append({
+                'id': block['discipline_id'],
+                'name': f'Дисциплина {block["discipline_id"]}',
+                'credits': block['credit_units'],
+                'examType': data.control_types[block['control_type_id']],
+                'hasCourseWork': False,
+                'hasPracticalWork': False,
+                'department': '',
+                'competenceCodes': [competency['id'] for competency in block['competencies']],
+                'lectureHours': block['lecture_hours'],
+                'labHours': block['lab_hours'],
+                'practicalHours': block['practice_hours']
+            })
+        rows.append({'name': map_core['name'], 'color': '#FFFFFF', 'data': semester_disciplines})
+    return rows
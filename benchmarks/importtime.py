@@ -0,0 +1,69 @@
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# бюджет накопительного времени импорта модуля (мс) при холодном старте приложения;
+# бюджеты с запасом, их цель - заметить новую тяжелую зависимость, а не шум измерений
+IMPORT_BUDGETS_MS: dict[str, float] = {
+    'src.main': 1500,
+    'src.dependencies': 600,
+    'src.maps.routes': 100,
+}
+
+# модули, которые нужны только отдельным роутам и должны импортироваться лениво
+LAZY_MODULES: tuple[str, ...] = ('openpyxl',)
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def measure_import(module: str = 'src.main') -> dict[str, ImportTiming]:
+    """Import the module in a fresh interpreter with -X importtime and return the timing of every imported module."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = ImportTiming(name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2)
+    return timings
+
+
+def best_of(runs: list[dict[str, ImportTiming]]) -> dict[str, ImportTiming]:
+    """Keep the fastest measurement of every module, which is the least affected by noise."""
+    best = {}
+    for timings in runs:
+        for name, timing in timings.items():
+            if name not in best or timing.cumulative_ms < best[name].cumulative_ms:
+                best[name] = timing
+    return best
+
+
+def check_budgets(
+        timings: dict[str, ImportTiming],
+        budgets: dict[str, float] = IMPORT_BUDGETS_MS,
+        lazy_modules: tuple[str, ...] = LAZY_MODULES
+) -> list[str]:
+    """Return the violations: modules over their budget and lazy modules imported at startup."""
+    violations = [
+        f'{module}: {timings[module].cumulative_ms:.1f} ms > {budget:.0f} ms'
+        for module, budget in budgets.items()
+        if module in timings and timings[module].cumulative_ms > budget
+    ]
+    violations += [f'{module}: imported at startup' for module in lazy_modules if module in timings]
+    return violations
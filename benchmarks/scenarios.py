@@ -0,0 +1,118 @@
+import math
+import statistics
+import tracemalloc
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable
+from fastapi.testclient import TestClient
+from src.monitoring.testing import capture_queries
+from .generator import GeneratorConfig, SeededData, build_validation_request
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    json: dict | list | None = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    # (данные, номер итерации) -> запрос; итерации перебирают направления по кругу
+    build_request: Callable[[SeededData, int], Request]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    iterations: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    queries_p50: float
+    queries_max: int
+    peak_memory_kb: float
+    response_bytes: int
+
+
+def _direction(data: SeededData, iteration: int) -> int:
+    return data.direction_ids[iteration % len(data.direction_ids)]
+
+
+def build_scenarios(config: GeneratorConfig) -> list[Scenario]:
+    return [
+        Scenario('load_map', lambda data, i: Request(
+            'POST', f'/directions/{_direction(data, i)}/maps/load', data.plans[_direction(data, i)]
+        )),
+        Scenario('unload_map', lambda data, i: Request('GET', f'/directions/{_direction(data, i)}/maps/unload')),
+        Scenario('export_map_excel', lambda data, i: Request(
+            'GET', f'/directions/{_direction(data, i)}/maps/export/excel'
+        )),
+        Scenario('validate_up', lambda data, i: Request(
+            'POST', '/validations/validate-up', build_validation_request(data, _direction(data, i), config.semesters)
+        )),
+        Scenario('list_directions', lambda data, i: Request('GET', '/directions')),
+        Scenario('list_disciplines', lambda data, i: Request('GET', '/disciplines')),
+        Scenario('list_competencies', lambda data, i: Request('GET', '/competencies')),
+        Scenario('list_map_cors', lambda data, i: Request('GET', '/map-cors')),
+    ]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def _send(client: TestClient, request: Request):
+    response = client.request(request.method, request.url, json=request.json)
+    if response.status_code >= 400:
+        raise RuntimeError(f'{request.method} {request.url} -> {response.status_code}: {response.text[:500]}')
+    return response
+
+
+def run_scenario(
+        client: TestClient, scenario: Scenario, data: SeededData, iterations: int, warmup: int = 1
+) -> ScenarioResult:
+    """
+    Run the scenario through the in-process ASGI application. Latency and query counts are measured
+    without tracemalloc, which slows allocations down considerably; peak memory is taken from
+    one additional traced iteration.
+    """
+    for i in range(warmup):
+        _send(client, scenario.build_request(data, i))
+
+    durations = []
+    queries = []
+    response_bytes = 0
+    for i in range(iterations):
+        request = scenario.build_request(data, i)
+        with capture_queries() as log:
+            started_at = perf_counter()
+            response = _send(client, request)
+            durations.append((perf_counter() - started_at) * 1000)
+        queries.append(log.count)
+        response_bytes = len(response.content)
+
+    request = scenario.build_request(data, 0)
+    tracemalloc.start()
+    try:
+        _send(client, request)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return ScenarioResult(
+        name=scenario.name,
+        iterations=iterations,
+        p50_ms=round(percentile(durations, 50), 3),
+        p99_ms=round(percentile(durations, 99), 3),
+        mean_ms=round(statistics.fmean(durations), 3),
+        max_ms=round(max(durations), 3),
+        queries_p50=percentile(queries, 50),
+        queries_max=max(queries),
+        peak_memory_kb=round(peak / 1024, 1),
+        response_bytes=response_bytes
+    )
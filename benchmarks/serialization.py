@@ -0,0 +1,96 @@
+import json
+import random
+import statistics
+from time import perf_counter
+from typing import Callable
+import orjson
+from fastapi.encoders import jsonable_encoder
+from src.maps.schemas import MapUnload
+from src.maps.serialization import construct_map_core_unload, dump_json
+
+
+def build_map_unload_data(blocks: int, map_cors: int = 3, competencies_per_block: int = 3, seed: int = 0) -> dict:
+    """Build a MapUnload-shaped dict with the given total number of discipline blocks."""
+    rnd = random.Random(seed)
+    return {'map_cors': [
+        {
+            'id': core,
+            'name': f'Ядро {core}',
+            'semesters_count': 8,
+            'discipline_blocks': [
+                {
+                    'id': core * blocks + i,
+                    'discipline': {
+                        'id': i,
+                        'name': f'Дисциплина {i}',
+                        'short_name': f'Д{i}',
+                        'department': {'id': i % 10, 'name': f'Кафедра {i % 10}', 'short_name': f'К{i % 10}'}
+                    },
+                    'credit_units': rnd.randint(1, 8),
+                    'control_type': {'id': 1, 'name': 'Экзамен'},
+                    'lecture_hours': rnd.randrange(0, 64, 2),
+                    'practice_hours': rnd.randrange(0, 64, 2),
+                    'lab_hours': rnd.randrange(0, 64, 2),
+                    'semester_number': rnd.randint(1, 8),
+                    'competencies': [
+                        {
+                            'id': c,
+                            'code': f'ПК-{c}',
+                            'name': f'Компетенция {c}',
+                            'description': 'Способен решать задачи профессиональной деятельности',
+                            'competency_group_id': c % 5
+                        }
+                        for c in rnd.sample(range(100), competencies_per_block)
+                    ]
+                }
+                for i in range(blocks // map_cors)
+            ]
+        }
+        for core in range(map_cors)
+    ]}
+
+
+def build_serializers(data: dict) -> dict[str, Callable[[], bytes]]:
+    """
+    Ways to turn the map into response bytes:
+    the former default path (validation against MapUnload, jsonable_encoder, stdlib json),
+    the same path rendered by orjson, pydantic-core serialization of the validated model
+    and the trusted-rows path used by the unload routes.
+    """
+    validated = MapUnload.model_validate(data)
+    constructed = MapUnload.model_construct(
+        map_cors=[construct_map_core_unload(map_core) for map_core in data['map_cors']]
+    )
+
+    def stdlib_json() -> bytes:
+        content = jsonable_encoder(MapUnload.model_validate(data))
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+    return {
+        'validate+jsonable_encoder+json': stdlib_json,
+        'validate+jsonable_encoder+orjson': lambda: orjson.dumps(jsonable_encoder(MapUnload.model_validate(data))),
+        'model_dump_json(validated)': validated.model_dump_json,
+        'model_dump_json(constructed)': lambda: constructed.model_dump_json(warnings=False),
+        'orjson(trusted dicts)': lambda: dump_json(data),
+    }
+
+
+def run_serialization_benchmark(blocks: int = 300, repeat: int = 50) -> list[dict]:
+    data = build_map_unload_data(blocks)
+    results = []
+    for name, serialize in build_serializers(data).items():
+        serialize()
+        durations = []
+        for _ in range(repeat):
+            started_at = perf_counter()
+            content = serialize()
+            durations.append((perf_counter() - started_at) * 1000)
+        results.append({
+            'name': name,
+            'blocks': blocks,
+            'repeat': repeat,
+            'median_ms': round(statistics.median(durations), 3),
+            'min_ms': round(min(durations), 3),
+            'bytes': len(content)
+        })
+    return results
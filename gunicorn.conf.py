@@ -0,0 +1,65 @@
+"""
+Production serving: several uvicorn worker processes under gunicorn.
+
+    gunicorn -c gunicorn.conf.py src.main:app
+
+For development keep using uvicorn src.main:app --reload.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f'0.0.0.0:{os.getenv("PORT", "8000")}'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# приложение импортируется один раз в мастер-процессе, воркеры получают его через fork
+preload_app = True
+
+# при остановке воркер перестает принимать соединения и дожидается текущих запросов не дольше graceful_timeout
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.getenv('WORKER_TIMEOUT', '60'))
+keepalive = int(os.getenv('KEEPALIVE', '5'))
+
+# общий бюджет соединений с PostgreSQL делится между воркерами: у каждого свой пул,
+# поэтому pool_size × workers не должен превышать max_connections сервера БД;
+# еще одно соединение на воркер вне пула занимает LISTEN уведомлений об изменении планов
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '80'))
+os.environ.setdefault('DB_POOL_SIZE', str(max(1, DB_MAX_CONNECTIONS // workers - 1)))
+os.environ.setdefault('DB_MAX_OVERFLOW', '0')
+os.environ.setdefault('DB_ECHO', '0')
+
+# метрики Prometheus воркеры пишут в общий каталог, /metrics любого воркера суммирует их по всем процессам;
+# переменная должна быть задана до импорта приложения (preload_app) и prometheus_client
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'prometheus_multiproc')
+)
+os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # файлы метрик прошлого запуска исказили бы счетчики; при перезагрузке по HUP каталог не очищается
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR)
+
+
+def post_fork(server, worker):
+    # соединения, открытые в мастер-процессе, нельзя использовать из нескольких процессов
+    from src.database import engine
+    engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    from src.database import engine
+    engine.dispose()
+
+
+def child_exit(server, worker):
+    # live-gauge завершившегося воркера больше не учитываются, его счетчики и гистограммы сохраняются
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
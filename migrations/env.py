@@ -20,6 +20,8 @@ from src.educational_forms.model import EducationalForm
 from src.educational_levels.model import EducationalLevel
 from src.indicators.model import Indicator
 from src.map_cors.model import MapCore
+from src.maps.model import PlanSnapshot, PlanVersion
+from src.table_revisions.model import TableRevision
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,39 @@
+"""Add plan_version in directions
+
+Revision ID: 1658e653441c
+Revises: 20251210_add_calendar_plan.py
+Create Date: 2026-10-19 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1658e653441c'
+down_revision: Union[str, None] = '20251210_add_calendar_plan.py'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('directions', sa.Column('plan_version', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_direction_map_cors_direction_id', 'direction_map_cors', ['direction_id'])
+    op.create_index('ix_direction_map_cors_map_core_id', 'direction_map_cors', ['map_core_id'])
+    op.create_index('ix_discipline_blocks_map_core_id', 'discipline_blocks', ['map_core_id'])
+    op.create_index(
+        'ix_discipline_block_competencies_discipline_block_id', 'discipline_block_competencies',
+        ['discipline_block_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_discipline_block_competencies_discipline_block_id', 'discipline_block_competencies')
+    op.drop_index('ix_discipline_blocks_map_core_id', 'discipline_blocks')
+    op.drop_index('ix_direction_map_cors_map_core_id', 'direction_map_cors')
+    op.drop_index('ix_direction_map_cors_direction_id', 'direction_map_cors')
+    op.drop_column('directions', 'plan_version')
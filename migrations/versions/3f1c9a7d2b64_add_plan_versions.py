@@ -0,0 +1,39 @@
+"""Add plan_versions
+
+Revision ID: 3f1c9a7d2b64
+Revises: eeb53d015fb6
+Create Date: 2026-10-19 19:41:12.508113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, None] = 'eeb53d015fb6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'plan_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('direction_id', sa.Integer(), nullable=False),
+        sa.Column('plan_version', sa.Integer(), nullable=False),
+        sa.Column('chain_length', sa.Integer(), nullable=False),
+        sa.Column('content', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['direction_id'], ['directions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('direction_id', 'plan_version')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('plan_versions')
@@ -0,0 +1,43 @@
+"""Add trigram search indexes
+
+Revision ID: b8c696fae708
+Revises: 1658e653441c
+Create Date: 2026-10-19 11:04:17.220915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c696fae708'
+down_revision: Union[str, None] = '1658e653441c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('disciplines', 'name'),
+    ('disciplines', 'short_name'),
+    ('competencies', 'code'),
+    ('competencies', 'name'),
+    ('competencies', 'description'),
+    ('indicators', 'code'),
+    ('indicators', 'name'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            f'ix_{table}_{column}_trgm', table, [column],
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(TRIGRAM_INDEXES):
+        op.drop_index(f'ix_{table}_{column}_trgm', table)
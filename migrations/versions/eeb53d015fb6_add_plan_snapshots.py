@@ -0,0 +1,36 @@
+"""Add plan_snapshots
+
+Revision ID: eeb53d015fb6
+Revises: b8c696fae708
+Create Date: 2026-10-19 17:02:44.381207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eeb53d015fb6'
+down_revision: Union[str, None] = 'b8c696fae708'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'plan_snapshots',
+        sa.Column('direction_id', sa.Integer(), nullable=False),
+        sa.Column('plan_version', sa.Integer(), nullable=False),
+        sa.Column('content', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['direction_id'], ['directions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('direction_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('plan_snapshots')
@@ -4,5 +4,5 @@ from .model import ActivityType
 
 
 class ActivityTypesRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, ActivityType)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, ActivityType, autocommit)
@@ -1,12 +1,18 @@
 from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
 from src.dependencies import SessionDep
+from src.reference_data.snapshot import reference_data
 from src.exceptions import ActivityTypeNotFoundException, ActivityTypeNameIsNotUniqueException
 from .model import ActivityType
 from .schemas import ActivityTypeCreate, ActivityTypeUpdate, ActivityTypeRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'activity_types_name_key': ActivityTypeNameIsNotUniqueException,
+}
+
 router = APIRouter(
     prefix='/activity-types',
     tags=['activity types']
@@ -23,7 +29,7 @@ router = APIRouter(
 )
 def get_activity_type(activity_type_id: Annotated[int, Path(gt=0)], session: SessionDep) -> ActivityTypeRead:
     """Return the activity type with the specified id"""
-    activity_type = session.get(ActivityType, activity_type_id)
+    activity_type = reference_data.get(session, ActivityType, activity_type_id)
     if not activity_type:
         raise ActivityTypeNotFoundException()
     return activity_type
@@ -42,21 +48,12 @@ def update_activity_type(
         activity_type_id: Annotated[int, Path(gt=0)], activity_type_data: ActivityTypeUpdate, session: SessionDep
 ) -> ActivityTypeRead:
     """Update the activity type with the specified id with the given information (blank values are ignored)"""
-    activity_type = session.get(ActivityType, activity_type_id)
-    if not activity_type:
-        raise ActivityTypeNotFoundException()
-
-    if activity_type_data.name:
-        stmt = select(exists().where(and_(
-            ActivityType.name == activity_type_data.name, ActivityType.id != activity_type_id
-        )))
-        if session.execute(stmt).scalar():
-            raise ActivityTypeNameIsNotUniqueException()
-
-    for key, value in activity_type_data.model_dump(exclude_none=True).items():
-        setattr(activity_type, key, value)
+    activity_type = update_returning(
+        session, ActivityType, activity_type_id, activity_type_data.model_dump(exclude_none=True),
+        not_found=ActivityTypeNotFoundException, errors=CONSTRAINT_ERRORS
+    )
     session.commit()
-    session.refresh(activity_type)
+    reference_data.invalidate(ActivityType)
     return activity_type
 
 
@@ -76,18 +73,19 @@ def delete_activity_type(activity_type_id: Annotated[int, Path(gt=0)], session:
         raise ActivityTypeNotFoundException()
     session.delete(activity_type)
     session.commit()
+    reference_data.invalidate(ActivityType)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get(
     '',
     responses={200: {'description': 'Activity types successfully received'}},
+    response_model=list[ActivityTypeRead],
     summary='Return a list of activity types'
 )
-def get_activity_types(session: SessionDep) -> list[ActivityTypeRead]:
+def get_activity_types(session: SessionDep) -> Response:
     """Return a list of activity types."""
-    activity_types = session.execute(select(ActivityType)).scalars()
-    return activity_types
+    return Response(content=reference_data.list_json(session, ActivityType), media_type='application/json')
 
 
 @router.post(
@@ -102,12 +100,7 @@ def get_activity_types(session: SessionDep) -> list[ActivityTypeRead]:
 )
 def create_activity_type(activity_type_data: ActivityTypeCreate, session: SessionDep) -> Any:
     """Create the activity type with the given information."""
-    stmt = select(exists().where(ActivityType.name == activity_type_data.name))
-    if session.execute(stmt).scalar():
-        raise ActivityTypeNameIsNotUniqueException()
-
-    activity_type = ActivityType(**activity_type_data.model_dump())
-    session.add(activity_type)
+    activity_type = insert_returning(session, ActivityType, activity_type_data.model_dump(), CONSTRAINT_ERRORS)
     session.commit()
-    session.refresh(activity_type)
+    reference_data.invalidate(ActivityType)
     return activity_type
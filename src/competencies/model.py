@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Integer, String, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.core.base_model import Base
 
@@ -6,6 +6,14 @@ from src.core.base_model import Base
 class Competency(Base):
     """Компетенции."""
     __tablename__ = 'competencies'
+    __table_args__ = (
+        Index('ix_competencies_code_trgm', 'code', postgresql_using='gin', postgresql_ops={'code': 'gin_trgm_ops'}),
+        Index('ix_competencies_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index(
+            'ix_competencies_description_trgm', 'description',
+            postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     code: Mapped[str] = mapped_column(String(10), nullable=False, unique=True)
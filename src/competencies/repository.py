@@ -4,5 +4,5 @@ from .model import Competency
 
 
 class CompetenciesRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, Competency)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, Competency, autocommit)
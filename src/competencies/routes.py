@@ -1,20 +1,44 @@
-from fastapi import APIRouter, status, Path
+from fastapi import APIRouter, status, Path, Query
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
+from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.search import build_search_stmt
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
+from src.maps.snapshots import invalidate_plan_snapshots
 from src.exceptions import (
     CompetencyNotFoundException, CompetencyCodeIsNotUniqueException, CompetencyGroupNotFoundException)
-from src.competency_groups.model import CompetencyGroup
 from .model import Competency
 from .schemas import CompetencyCreate, CompetencyUpdate, CompetencyRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'competencies_code_key': CompetencyCodeIsNotUniqueException,
+    'competencies_competency_group_id_fkey': CompetencyGroupNotFoundException,
+}
+
 router = APIRouter(
     prefix='/competencies',
     tags=['competencies']
 )
 
 
+@router.get(
+    '/search',
+    responses={200: {'description': 'Competencies successfully found'}},
+    summary='Search competencies'
+)
+def search_competencies(
+        q: Annotated[str, Query(min_length=1, max_length=255, pattern=r'\S')],
+        session: SessionDep,
+        limit: Annotated[int, Query(ge=1, le=100)] = 20
+) -> list[CompetencyRead]:
+    """Return competencies matching the query by code, name and description, ranked by prefix match and similarity."""
+    stmt = build_search_stmt(Competency, [Competency.code, Competency.name, Competency.description], q, limit)
+    return session.execute(stmt).scalars()
+
+
 @router.get(
     '/{competency_id}',
     responses={
@@ -44,24 +68,14 @@ def update_competency(
         competency_id: Annotated[int, Path(gt=0)], competency_data: CompetencyUpdate, session: SessionDep
 ) -> CompetencyRead:
     """Update the competency with the specified id with the given information (blank values are ignored)"""
-    competency = session.get(Competency, competency_id)
-    if not competency:
-        raise CompetencyNotFoundException()
-
-    if competency_data.code:
-        stmt = select(exists().where(and_(Competency.code == competency_data.code, Competency.id != competency_id)))
-        if session.execute(stmt).scalar():
-            raise CompetencyCodeIsNotUniqueException()
-
-    if competency_data.competency_group_id:
-        competency_group = session.get(CompetencyGroup, competency_data.competency_group_id)
-        if not competency_group:
-            raise CompetencyGroupNotFoundException()
-
-    for key, value in competency_data.model_dump(exclude_none=True).items():
-        setattr(competency, key, value)
+    competency = update_returning(
+        session, Competency, competency_id, competency_data.model_dump(exclude_none=True),
+        not_found=CompetencyNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    # данные входят в снимки планов направлений, они пересоберутся при следующем чтении
+    invalidate_plan_snapshots(session)
+    bump_table_revision(session, Competency)
     session.commit()
-    session.refresh(competency)
     return competency
 
 
@@ -80,6 +94,7 @@ def delete_competency(competency_id: Annotated[int, Path(gt=0)], session: Sessio
     if not competency:
         raise CompetencyNotFoundException()
     session.delete(competency)
+    bump_table_revision(session, Competency)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -108,16 +123,7 @@ def get_competencies(session: SessionDep) -> list[CompetencyRead]:
 )
 def create_competency(competency_data: CompetencyCreate, session: SessionDep) -> Any:
     """Create the competency with the given information."""
-    stmt = select(exists().where(Competency.code == competency_data.code))
-    if session.execute(stmt).scalar():
-        raise CompetencyCodeIsNotUniqueException()
-
-    competency_group = session.get(CompetencyGroup, competency_data.competency_group_id)
-    if not competency_group:
-        raise CompetencyGroupNotFoundException()
-
-    competency = Competency(**competency_data.model_dump())
-    session.add(competency)
+    competency = insert_returning(session, Competency, competency_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, Competency)
     session.commit()
-    session.refresh(competency)
     return competency
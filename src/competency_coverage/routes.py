@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Path, Query
+from typing import Annotated
+from src.dependencies import CompetencyCoverageServiceDep
+from .schemas import DirectionCompetencyCoverage
+
+router = APIRouter(
+    tags=['competency coverage']
+)
+
+
+@router.get(
+    '/directions/{direction_id}/competency-coverage',
+    responses={
+        200: {'description': 'Competency coverage successfully received'},
+        404: {'description': 'Direction not found'}
+    },
+    summary='Return the competency coverage of the direction'
+)
+def get_competency_coverage(
+        direction_id: Annotated[int, Path(gt=0)],
+        competency_coverage_service: CompetencyCoverageServiceDep,
+        min_blocks: Annotated[int, Query(ge=1)] = 2,
+        max_blocks: Annotated[int, Query(ge=1)] = 8,
+        competency_group_id: Annotated[list[int] | None, Query()] = None
+) -> DirectionCompetencyCoverage:
+    """
+    Return the number of discipline blocks covering each competency of the direction competency groups
+    (overall and per semester) and mark uncovered, thinly and heavily covered competencies
+    """
+    return competency_coverage_service.get_coverage(direction_id, min_blocks, max_blocks, competency_group_id)
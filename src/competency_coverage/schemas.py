@@ -0,0 +1,36 @@
+from enum import Enum
+from typing import Annotated
+from pydantic import BaseModel, Field
+
+
+class CoverageStatus(str, Enum):
+    UNCOVERED = 'uncovered'
+    THIN = 'thin'
+    NORMAL = 'normal'
+    HEAVY = 'heavy'
+
+
+class SemesterCoverage(BaseModel):
+    semester_number: Annotated[int, Field(example=3)]
+    blocks_count: Annotated[int, Field(example=2)]
+
+
+class CompetencyCoverage(BaseModel):
+    id: Annotated[int, Field(example=1)]
+    code: Annotated[str, Field(example='УК-3')]
+    name: Annotated[str, Field(example='Командная работа и лидерство')]
+    competency_group_id: Annotated[int, Field(example=1)]
+    blocks_count: Annotated[int, Field(example=4)]
+    status: CoverageStatus
+    semesters: list[SemesterCoverage]
+
+
+class DirectionCompetencyCoverage(BaseModel):
+    direction_id: Annotated[int, Field(example=1)]
+    plan_version: Annotated[int, Field(example=12)]
+    min_blocks: Annotated[int, Field(example=2)]
+    max_blocks: Annotated[int, Field(example=8)]
+    uncovered_count: Annotated[int, Field(example=1)]
+    thin_count: Annotated[int, Field(example=3)]
+    heavy_count: Annotated[int, Field(example=0)]
+    competencies: list[CompetencyCoverage]
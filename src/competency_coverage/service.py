@@ -0,0 +1,106 @@
+from sqlalchemy import select, func, Row
+from sqlalchemy.orm import Session
+from src.core.cache import RevisionCache
+from src.competencies.model import Competency
+from src.direction_map_cors.model import DirectionMapCore
+from src.discipline_block_competencies.model import DisciplineBlockCompetency
+from src.discipline_blocks.model import DisciplineBlock
+from src.exceptions import DirectionNotFoundException
+from src.maps.revisions import get_plan_revision
+from .schemas import CoverageStatus, SemesterCoverage, CompetencyCoverage, DirectionCompetencyCoverage
+
+# в кэше хранятся "сырые" счетчики покрытия, пороги применяются к ним при каждом запросе
+coverage_cache = RevisionCache('competency_coverage')
+
+
+class CompetencyCoverageService:
+    def __init__(self, session: Session):
+        self.session: Session = session
+
+    def get_coverage(
+            self, direction_id: int, min_blocks: int, max_blocks: int, competency_group_ids: list[int] | None = None
+    ) -> DirectionCompetencyCoverage:
+        # кроме плана результат зависит от списка компетенций групп и их кодов и наименований
+        revision = get_plan_revision(self.session, direction_id, Competency)
+        if revision is None:
+            raise DirectionNotFoundException()
+        plan_version = revision[0]
+
+        group_ids = tuple(sorted(set(competency_group_ids))) if competency_group_ids else None
+        competencies, counts = coverage_cache.get_or_set(
+            (direction_id, group_ids), revision, lambda: self._count_coverage(direction_id, group_ids)
+        )
+
+        competencies_coverage = []
+        for competency in competencies:
+            semesters = counts.get(competency.id, {})
+            blocks_count = sum(semesters.values())
+            competencies_coverage.append(CompetencyCoverage(
+                id=competency.id,
+                code=competency.code,
+                name=competency.name,
+                competency_group_id=competency.competency_group_id,
+                blocks_count=blocks_count,
+                status=self._get_status(blocks_count, min_blocks, max_blocks),
+                semesters=[
+                    SemesterCoverage(semester_number=semester_number, blocks_count=semester_blocks_count)
+                    for semester_number, semester_blocks_count in sorted(semesters.items())
+                ]
+            ))
+
+        return DirectionCompetencyCoverage(
+            direction_id=direction_id,
+            plan_version=plan_version,
+            min_blocks=min_blocks,
+            max_blocks=max_blocks,
+            uncovered_count=sum(c.status == CoverageStatus.UNCOVERED for c in competencies_coverage),
+            thin_count=sum(c.status == CoverageStatus.THIN for c in competencies_coverage),
+            heavy_count=sum(c.status == CoverageStatus.HEAVY for c in competencies_coverage),
+            competencies=competencies_coverage
+        )
+
+    def _count_coverage(
+            self, direction_id: int, competency_group_ids: tuple[int, ...] | None
+    ) -> tuple[list[Row], dict[int, dict[int, int]]]:
+        # количество блоков дисциплин, формирующих компетенцию, в разрезе семестров
+        stmt = (
+            select(
+                DisciplineBlockCompetency.competency_id,
+                DisciplineBlock.semester_number,
+                func.count(DisciplineBlock.id.distinct())
+            )
+            .select_from(DirectionMapCore)
+            .join(DisciplineBlock, DisciplineBlock.map_core_id == DirectionMapCore.map_core_id)
+            .join(DisciplineBlockCompetency, DisciplineBlockCompetency.discipline_block_id == DisciplineBlock.id)
+            .where(DirectionMapCore.direction_id == direction_id)
+            .group_by(DisciplineBlockCompetency.competency_id, DisciplineBlock.semester_number)
+        )
+        counts: dict[int, dict[int, int]] = {}
+        for competency_id, semester_number, blocks_count in self.session.execute(stmt):
+            counts.setdefault(competency_id, {})[semester_number] = blocks_count
+
+        # если группы не указаны явно, берем группы компетенций, которые уже встречаются в плане
+        if competency_group_ids is None:
+            groups_filter = Competency.competency_group_id.in_(
+                select(Competency.competency_group_id).where(Competency.id.in_(list(counts))).distinct()
+            )
+        else:
+            groups_filter = Competency.competency_group_id.in_(competency_group_ids)
+
+        stmt = (
+            select(Competency.id, Competency.code, Competency.name, Competency.competency_group_id)
+            .where(groups_filter)
+            .order_by(Competency.code)
+        )
+        competencies = self.session.execute(stmt).all()
+        return competencies, counts
+
+    @staticmethod
+    def _get_status(blocks_count: int, min_blocks: int, max_blocks: int) -> CoverageStatus:
+        if blocks_count == 0:
+            return CoverageStatus.UNCOVERED
+        if blocks_count < min_blocks:
+            return CoverageStatus.THIN
+        if blocks_count > max_blocks:
+            return CoverageStatus.HEAVY
+        return CoverageStatus.NORMAL
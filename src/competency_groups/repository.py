@@ -4,5 +4,5 @@ from .model import CompetencyGroup
 
 
 class CompetencyGroupsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, CompetencyGroup)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, CompetencyGroup, autocommit)
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, status, Path
+from fastapi import APIRouter, status, Path, Request
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
 from typing import Annotated, Any
+from src.core.compression import gzip_content_response
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
+from src.reference_data.snapshot import reference_data
 from src.exceptions import CompetencyGroupNotFoundException, CompetencyGroupNameIsNotUniqueException
 from .model import CompetencyGroup
-from .schemas import CompetencyGroupCreate, CompetencyGroupUpdate, CompetencyGroupRead
+from .schemas import CompetencyGroupCreate, CompetencyGroupUpdate, CompetencyGroupRead, CompetencyGroupTreeNode
+from .tree import get_competency_tree_gzip
+
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'competency_groups_name_key': CompetencyGroupNameIsNotUniqueException,
+}
 
 router = APIRouter(
     prefix='/competency-groups',
@@ -13,6 +22,18 @@ router = APIRouter(
 )
 
 
+# объявлен раньше '/{competency_group_id}', иначе 'tree' будет разобран как идентификатор группы
+@router.get(
+    '/tree',
+    responses={200: {'description': 'Competency tree successfully received'}},
+    response_model=list[CompetencyGroupTreeNode],
+    summary='Return competency groups with their competencies and indicators'
+)
+def get_competency_tree(request: Request, session: SessionDep) -> Response:
+    """Return all competency groups with nested competencies and their indicators, sorted by code."""
+    return gzip_content_response(request, get_competency_tree_gzip(session))
+
+
 @router.get(
     '/{competency_group_id}',
     responses={
@@ -23,7 +44,7 @@ router = APIRouter(
 )
 def get_competency_group(competency_group_id: Annotated[int, Path(gt=0)], session: SessionDep) -> CompetencyGroupRead:
     """Return the competency group with the specified id"""
-    competency_group = session.get(CompetencyGroup, competency_group_id)
+    competency_group = reference_data.get(session, CompetencyGroup, competency_group_id)
     if not competency_group:
         raise CompetencyGroupNotFoundException()
     return competency_group
@@ -43,21 +64,13 @@ def update_competency_group(
         session: SessionDep
 ) -> CompetencyGroupRead:
     """Update the competency group with the specified id with the given information (blank values are ignored)"""
-    competency_group = session.get(CompetencyGroup, competency_group_id)
-    if not competency_group:
-        raise CompetencyGroupNotFoundException()
-
-    if competency_group_data.name:
-        stmt = select(exists().where(and_(
-            CompetencyGroup.name == competency_group_data.name, CompetencyGroup.id != competency_group_id)
-        ))
-        if session.execute(stmt).scalar():
-            raise CompetencyGroupNameIsNotUniqueException()
-
-    for key, value in competency_group_data.model_dump(exclude_none=True).items():
-        setattr(competency_group, key, value)
+    competency_group = update_returning(
+        session, CompetencyGroup, competency_group_id, competency_group_data.model_dump(exclude_none=True),
+        not_found=CompetencyGroupNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_table_revision(session, CompetencyGroup)
     session.commit()
-    session.refresh(competency_group)
+    reference_data.invalidate(CompetencyGroup)
     return competency_group
 
 
@@ -76,19 +89,21 @@ def delete_competency_group(competency_group_id: Annotated[int, Path(gt=0)], ses
     if not competency_group:
         raise CompetencyGroupNotFoundException()
     session.delete(competency_group)
+    bump_table_revision(session, CompetencyGroup)
     session.commit()
+    reference_data.invalidate(CompetencyGroup)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get(
     '',
     responses={200: {'description': 'Competency groups successfully received'}},
+    response_model=list[CompetencyGroupRead],
     summary='Return a list of competency groups'
 )
-def get_competency_groups(session: SessionDep) -> list[CompetencyGroupRead]:
+def get_competency_groups(session: SessionDep) -> Response:
     """Return a list of competency groups."""
-    competency_groups = session.execute(select(CompetencyGroup)).scalars()
-    return competency_groups
+    return Response(content=reference_data.list_json(session, CompetencyGroup), media_type='application/json')
 
 
 @router.post(
@@ -103,12 +118,8 @@ def get_competency_groups(session: SessionDep) -> list[CompetencyGroupRead]:
 )
 def create_competency_group(competency_group_data: CompetencyGroupCreate, session: SessionDep) -> Any:
     """Create the competency group with the given information."""
-    stmt = select(exists().where(CompetencyGroup.name == competency_group_data.name))
-    if session.execute(stmt).scalar():
-        raise CompetencyGroupNameIsNotUniqueException()
-
-    competency_group = CompetencyGroup(**competency_group_data.model_dump())
-    session.add(competency_group)
+    competency_group = insert_returning(session, CompetencyGroup, competency_group_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, CompetencyGroup)
     session.commit()
-    session.refresh(competency_group)
+    reference_data.invalidate(CompetencyGroup)
     return competency_group
@@ -12,3 +12,22 @@ class CompetencyGroupUpdate(BaseModel):
 
 class CompetencyGroupRead(CompetencyGroupCreate):
     id: Annotated[int, Field(example=1)]
+
+
+class IndicatorTreeNode(BaseModel):
+    id: Annotated[int, Field(example=1)]
+    code: Annotated[str, Field(example='УК-3.1')]
+    name: Annotated[str, Field(example='Знать: методики формирования команд')]
+
+
+class CompetencyTreeNode(BaseModel):
+    id: Annotated[int, Field(example=1)]
+    code: Annotated[str, Field(example='УК-3')]
+    name: Annotated[str, Field(example='Командная работа и лидерство')]
+    description: Annotated[str, Field(example='Способен осуществлять социальное взаимодействие и реализовывать свою '
+                                              'роль в команде')]
+    indicators: list[IndicatorTreeNode]
+
+
+class CompetencyGroupTreeNode(CompetencyGroupRead):
+    competencies: list[CompetencyTreeNode]
@@ -0,0 +1,55 @@
+import gzip
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from src.core.cache import RevisionCache
+from src.competencies.model import Competency
+from src.indicators.model import Indicator
+from src.table_revisions.revisions import table_revision
+from src.maps.snapshots import COMPRESS_LEVEL
+from .model import CompetencyGroup
+
+# в кэше хранится готовое сжатое тело ответа, дерево целиком пересобирается при любом изменении трех таблиц
+tree_cache = RevisionCache('competency_tree', max_size=1)
+
+
+def _get_revision(session: Session) -> tuple[int, int, int]:
+    # ревизии увеличиваются CRUD-роутами групп, компетенций и индикаторов, их чтение не зависит от размера каталога
+    stmt = select(table_revision(CompetencyGroup), table_revision(Competency), table_revision(Indicator))
+    return tuple(session.execute(stmt).one())
+
+
+def _build_tree_gzip(session: Session) -> bytes:
+    # группы, компетенции и индикаторы загружаются тремя запросами
+    # (selectinload дробит IN-список родителей на пачки по 500, так что на больших каталогах чуть больше)
+    stmt = (
+        select(CompetencyGroup)
+        .options(selectinload(CompetencyGroup.competencies).selectinload(Competency.indicators))
+        .order_by(CompetencyGroup.id)
+    )
+    # словари собираются в порядке полей CompetencyGroupTreeNode
+    groups = []
+    for group in session.execute(stmt).scalars():
+        groups.append({
+            'id': group.id,
+            'name': group.name,
+            'competencies': [
+                {
+                    'id': competency.id,
+                    'code': competency.code,
+                    'name': competency.name,
+                    'description': competency.description,
+                    'indicators': [
+                        {'id': indicator.id, 'code': indicator.code, 'name': indicator.name}
+                        for indicator in sorted(competency.indicators, key=lambda i: i.code)
+                    ]
+                }
+                for competency in sorted(group.competencies, key=lambda c: c.code)
+            ]
+        })
+    return gzip.compress(orjson.dumps(groups), compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+def get_competency_tree_gzip(session: Session) -> bytes:
+    """Return the gzip-compressed JSON of all competency groups with their competencies and indicators."""
+    return tree_cache.get_or_set(None, _get_revision(session), lambda: _build_tree_gzip(session))
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Path, Query
+from fastapi.responses import Response
+from typing import Annotated, Literal
+from src.dependencies import CompetencyMatrixServiceDep
+from .schemas import CompetencyMatrix
+
+router = APIRouter(
+    tags=['competency matrix']
+)
+
+
+@router.get(
+    '/directions/{direction_id}/competency-matrix',
+    responses={
+        200: {
+            'description': 'Competency matrix successfully received',
+            'content': {'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': {}}
+        },
+        404: {'description': 'Direction not found'}
+    },
+    summary='Return the competency matrix of the direction'
+)
+def get_competency_matrix(
+        direction_id: Annotated[int, Path(gt=0)],
+        competency_matrix_service: CompetencyMatrixServiceDep,
+        format: Annotated[Literal['json', 'xlsx'], Query()] = 'json'
+) -> CompetencyMatrix:
+    """
+    Return the discipline x competency matrix of the direction plan in a sparse form
+    (only non-empty cells are listed) or as an Excel file
+    """
+    if format == 'xlsx':
+        return Response(
+            content=competency_matrix_service.export_matrix_excel(direction_id),
+            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            headers={
+                'Content-Disposition': 'attachment; filename="competency_matrix.xlsx"',
+                'Access-Control-Expose-Headers': 'Content-Disposition',
+            }
+        )
+    return competency_matrix_service.get_matrix(direction_id)
@@ -0,0 +1,28 @@
+from typing import Annotated
+from pydantic import BaseModel, Field
+
+
+class MatrixDiscipline(BaseModel):
+    id: Annotated[int, Field(example=1)]
+    name: Annotated[str, Field(example='Проектный практикум')]
+    short_name: Annotated[str, Field(example='ПП')]
+
+
+class MatrixCompetency(BaseModel):
+    id: Annotated[int, Field(example=1)]
+    code: Annotated[str, Field(example='УК-3')]
+    name: Annotated[str, Field(example='Командная работа и лидерство')]
+
+
+class MatrixCell(BaseModel):
+    discipline_id: Annotated[int, Field(example=1)]
+    competency_id: Annotated[int, Field(example=1)]
+    semesters: Annotated[list[int], Field(example=[3, 4])]
+
+
+class CompetencyMatrix(BaseModel):
+    direction_id: Annotated[int, Field(example=1)]
+    plan_version: Annotated[int, Field(example=12)]
+    disciplines: list[MatrixDiscipline]
+    competencies: list[MatrixCompetency]
+    cells: list[MatrixCell]
@@ -0,0 +1,121 @@
+from io import BytesIO
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from src.core.cache import RevisionCache
+from src.competencies.model import Competency
+from src.direction_map_cors.model import DirectionMapCore
+from src.discipline_block_competencies.model import DisciplineBlockCompetency
+from src.discipline_blocks.model import DisciplineBlock
+from src.disciplines.model import Discipline
+from src.exceptions import DirectionNotFoundException
+from src.maps.revisions import get_plan_revision
+from .schemas import CompetencyMatrix, MatrixDiscipline, MatrixCompetency, MatrixCell
+
+# матрицы и их xlsx-представления живут, пока не изменились версия плана направления
+# и справочники дисциплин и компетенций, наименования из которых входят в матрицу
+matrix_cache = RevisionCache('competency_matrix')
+matrix_excel_cache = RevisionCache('competency_matrix_excel', max_size=64)
+
+
+class CompetencyMatrixService:
+    def __init__(self, session: Session):
+        self.session: Session = session
+
+    def get_matrix(self, direction_id: int) -> CompetencyMatrix:
+        return self._get_matrix(direction_id, self._get_revision(direction_id))
+
+    def export_matrix_excel(self, direction_id: int) -> bytes:
+        revision = self._get_revision(direction_id)
+        return matrix_excel_cache.get_or_set(
+            direction_id, revision, lambda: self._build_excel(self._get_matrix(direction_id, revision))
+        )
+
+    def _get_matrix(self, direction_id: int, revision: tuple[int, ...]) -> CompetencyMatrix:
+        return matrix_cache.get_or_set(
+            direction_id, revision, lambda: self._build_matrix(direction_id, revision[0])
+        )
+
+    def _get_revision(self, direction_id: int) -> tuple[int, ...]:
+        revision = get_plan_revision(self.session, direction_id, Discipline, Competency)
+        if revision is None:
+            raise DirectionNotFoundException()
+        return revision
+
+    def _build_matrix(self, direction_id: int, plan_version: int) -> CompetencyMatrix:
+        # одним агрегирующим запросом получаем все непустые ячейки матрицы;
+        # дисциплины без компетенций попадают в выборку благодаря внешнему соединению
+        stmt = (
+            select(
+                Discipline.id,
+                Discipline.name,
+                Discipline.short_name,
+                Competency.id,
+                Competency.code,
+                Competency.name,
+                func.array_agg(DisciplineBlock.semester_number.distinct())
+            )
+            .select_from(DirectionMapCore)
+            .join(DisciplineBlock, DisciplineBlock.map_core_id == DirectionMapCore.map_core_id)
+            .join(Discipline, Discipline.id == DisciplineBlock.discipline_id)
+            .outerjoin(DisciplineBlockCompetency, DisciplineBlockCompetency.discipline_block_id == DisciplineBlock.id)
+            .outerjoin(Competency, Competency.id == DisciplineBlockCompetency.competency_id)
+            .where(DirectionMapCore.direction_id == direction_id)
+            .group_by(Discipline.id, Competency.id)
+        )
+
+        disciplines: dict[int, MatrixDiscipline] = {}
+        first_semesters: dict[int, int] = {}
+        competencies: dict[int, MatrixCompetency] = {}
+        cells: list[MatrixCell] = []
+        for row in self.session.execute(stmt):
+            discipline_id, discipline_name, discipline_short_name = row[0], row[1], row[2]
+            competency_id, competency_code, competency_name = row[3], row[4], row[5]
+            semesters = sorted(row[6])
+
+            if discipline_id not in disciplines:
+                disciplines[discipline_id] = MatrixDiscipline(
+                    id=discipline_id, name=discipline_name, short_name=discipline_short_name
+                )
+            first_semesters[discipline_id] = min(first_semesters.get(discipline_id, semesters[0]), semesters[0])
+
+            if competency_id is None:
+                continue
+
+            if competency_id not in competencies:
+                competencies[competency_id] = MatrixCompetency(
+                    id=competency_id, code=competency_code, name=competency_name
+                )
+            cells.append(MatrixCell(discipline_id=discipline_id, competency_id=competency_id, semesters=semesters))
+
+        # строки упорядочиваем по первому семестру изучения дисциплины, столбцы - по коду компетенции
+        return CompetencyMatrix(
+            direction_id=direction_id,
+            plan_version=plan_version,
+            disciplines=sorted(disciplines.values(), key=lambda d: (first_semesters[d.id], d.name)),
+            competencies=sorted(competencies.values(), key=lambda c: c.code),
+            cells=sorted(cells, key=lambda c: (c.discipline_id, c.competency_id))
+        )
+
+    @staticmethod
+    def _build_excel(matrix: CompetencyMatrix) -> bytes:
+        # openpyxl нужен только экспорту, поэтому не импортируется при старте приложения
+        from openpyxl import Workbook
+
+        columns = {competency.id: index for index, competency in enumerate(matrix.competencies)}
+        cells_by_discipline: dict[int, list[MatrixCell]] = {}
+        for cell in matrix.cells:
+            cells_by_discipline.setdefault(cell.discipline_id, []).append(cell)
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Матрица компетенций')
+        ws.append(['Дисциплина'] + [competency.code for competency in matrix.competencies])
+
+        for discipline in matrix.disciplines:
+            row = [discipline.name] + [None] * len(columns)
+            for cell in cells_by_discipline.get(discipline.id, []):
+                row[columns[cell.competency_id] + 1] = ', '.join(map(str, cell.semesters))
+            ws.append(row)
+
+        output = BytesIO()
+        wb.save(output)
+        return output.getvalue()
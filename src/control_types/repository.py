@@ -4,5 +4,5 @@ from .model import ControlType
 
 
 class ControlTypesRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, ControlType)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, ControlType, autocommit)
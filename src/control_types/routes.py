@@ -1,12 +1,19 @@
 from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
 from src.dependencies import SessionDep
+from src.maps.snapshots import invalidate_plan_snapshots
+from src.reference_data.snapshot import reference_data
 from src.exceptions import ControlTypeNotFoundException, ControlTypeNameIsNotUniqueException
 from .model import ControlType
 from .schemas import ControlTypeCreate, ControlTypeUpdate, ControlTypeRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'control_types_name_key': ControlTypeNameIsNotUniqueException,
+}
+
 router = APIRouter(
     prefix='/control-types',
     tags=['control types']
@@ -23,7 +30,7 @@ router = APIRouter(
 )
 def get_control_type(control_type_id: Annotated[int, Path(gt=0)], session: SessionDep) -> ControlTypeRead:
     """Return the control type with the specified id"""
-    control_type = session.get(ControlType, control_type_id)
+    control_type = reference_data.get(session, ControlType, control_type_id)
     if not control_type:
         raise ControlTypeNotFoundException()
     return control_type
@@ -42,21 +49,14 @@ def update_control_type(
         control_type_id: Annotated[int, Path(gt=0)], control_type_data: ControlTypeUpdate, session: SessionDep
 ) -> ControlTypeRead:
     """Update the control type with the specified id with the given information (blank values are ignored)"""
-    control_type = session.get(ControlType, control_type_id)
-    if not control_type:
-        raise ControlTypeNotFoundException()
-
-    if control_type_data.name:
-        stmt = select(exists().where(and_(
-            ControlType.name == control_type_data.name, ControlType.id != control_type_id
-        )))
-        if session.execute(stmt).scalar():
-            raise ControlTypeNameIsNotUniqueException()
-
-    for key, value in control_type_data.model_dump(exclude_none=True).items():
-        setattr(control_type, key, value)
+    control_type = update_returning(
+        session, ControlType, control_type_id, control_type_data.model_dump(exclude_none=True),
+        not_found=ControlTypeNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    # данные входят в снимки планов направлений, они пересоберутся при следующем чтении
+    invalidate_plan_snapshots(session)
     session.commit()
-    session.refresh(control_type)
+    reference_data.invalidate(ControlType)
     return control_type
 
 
@@ -76,18 +76,19 @@ def delete_control_type(control_type_id: Annotated[int, Path(gt=0)], session: Se
         raise ControlTypeNotFoundException()
     session.delete(control_type)
     session.commit()
+    reference_data.invalidate(ControlType)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get(
     '',
     responses={200: {'description': 'Control types successfully received'}},
+    response_model=list[ControlTypeRead],
     summary='Return a list of control types'
 )
-def get_control_types(session: SessionDep) -> list[ControlTypeRead]:
+def get_control_types(session: SessionDep) -> Response:
     """Return a list of control types."""
-    control_types = session.execute(select(ControlType)).scalars()
-    return control_types
+    return Response(content=reference_data.list_json(session, ControlType), media_type='application/json')
 
 
 @router.post(
@@ -102,12 +103,7 @@ def get_control_types(session: SessionDep) -> list[ControlTypeRead]:
 )
 def create_control_type(control_type_data: ControlTypeCreate, session: SessionDep) -> Any:
     """Create the control type with the given information."""
-    stmt = select(exists().where(ControlType.name == control_type_data.name))
-    if session.execute(stmt).scalar():
-        raise ControlTypeNameIsNotUniqueException()
-
-    control_type = ControlType(**control_type_data.model_dump())
-    session.add(control_type)
+    control_type = insert_returning(session, ControlType, control_type_data.model_dump(), CONSTRAINT_ERRORS)
     session.commit()
-    session.refresh(control_type)
+    reference_data.invalidate(ControlType)
     return control_type
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+
+# все созданные кэши, используется для мониторинга
+caches: list['RevisionCache'] = []
+
+
+class RevisionCache:
+    """
+    Потокобезопасный LRU-кэш, в котором каждое значение привязано к ревизии данных.
+    Значение считается актуальным, только пока ревизия не изменилась.
+    """
+
+    def __init__(self, name: str, max_size: int = 256):
+        self.name: str = name
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, tuple[Hashable, Any]] = OrderedDict()
+        self._lock: Lock = Lock()
+        caches.append(self)
+
+    def get(self, key: Hashable, revision: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != revision:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, revision: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (revision, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, revision: Hashable, factory: Callable[[], Any]) -> Any:
+        missing = object()
+        value = self.get(key, revision, missing)
+        if value is missing:
+            value = factory()
+            self.set(key, revision, value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
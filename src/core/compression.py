@@ -0,0 +1,108 @@
+import gzip
+import os
+import zlib
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него ответы сжимаются только gzip
+    brotli = None
+
+# ответы меньше этого размера (байт) не сжимаются: выигрыш меньше накладных расходов
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+
+# в порядке предпочтения сервера при одинаковом весе в Accept-Encoding
+SUPPORTED_ENCODINGS: tuple[str, ...] = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding: str, available: tuple[str, ...] = SUPPORTED_ENCODINGS) -> str | None:
+    """Return the available content coding the client prefers according to Accept-Encoding or None."""
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    wildcard = weights.get('*', 0.0)
+    candidates = [(weights.get(coding, wildcard), -index, coding) for index, coding in enumerate(available)]
+    weight, _, coding = max(candidates, default=(0.0, 0, None))
+    return coding if weight > 0 else None
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = 'br'
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = BROTLI_QUALITY) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        body = self.compressor.process(body)
+        return body + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class FlushingGZipResponder(GZipResponder):
+    """
+    GZipResponder that flushes the compressor after every chunk of a streaming body, like BrotliResponder,
+    so the client can decode each chunk as soon as it arrives instead of waiting for the end of the stream.
+    """
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            self.gzip_file.write(body)
+            self.gzip_file.flush(zlib.Z_SYNC_FLUSH)
+            body = self.gzip_buffer.getvalue()
+            self.gzip_buffer.seek(0)
+            self.gzip_buffer.truncate()
+            return body
+        return super().apply_compression(body, more_body=more_body)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip chosen by Accept-Encoding. Small responses, event streams
+    and responses that already have Content-Encoding (precompressed ones) are sent as is.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get('Accept-Encoding', ''))
+        if encoding == 'br':
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif encoding == 'gzip':
+            responder = FlushingGZipResponder(self.app, self.minimum_size, compresslevel=GZIP_LEVEL)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+def gzip_content_response(request: Request, content: bytes, media_type: str = 'application/json') -> Response:
+    """
+    Return gzip-compressed content as is to clients accepting gzip (even if they prefer brotli,
+    so stored content is never compressed twice) and decompressed to the rest.
+    """
+    if choose_encoding(request.headers.get('Accept-Encoding', ''), ('gzip',)) == 'gzip':
+        headers = {'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'}
+        return Response(content=content, media_type=media_type, headers=headers)
+    # распакованный ответ может быть снова сжат CompressionMiddleware, она же добавит Vary
+    return Response(content=gzip.decompress(content), media_type=media_type)
@@ -0,0 +1,73 @@
+from typing import Any, Callable, Coroutine
+import msgpack
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from starlette.responses import Response
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+# устаревшее, но встречающееся в клиентах обозначение того же формата
+MSGPACK_MEDIA_TYPES: tuple[str, ...] = (MSGPACK_MEDIA_TYPE, 'application/x-msgpack')
+
+
+def _media_type_weights(accept: str) -> dict[str, float]:
+    weights = {}
+    for item in accept.split(','):
+        media_type, _, params = item.strip().partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[media_type.strip().lower()] = weight
+    return weights
+
+
+def accepts_msgpack(request: Request) -> bool:
+    """Return True if the client explicitly prefers MessagePack over JSON according to Accept."""
+    weights = _media_type_weights(request.headers.get('Accept', ''))
+    msgpack_weight = max(weights.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    json_weight = weights.get('application/json', weights.get('application/*', weights.get('*/*', 0.0)))
+    return msgpack_weight > 0 and msgpack_weight >= json_weight
+
+
+def msgpack_response(content: Any) -> Response:
+    """Serialize plain data (dicts, lists, scalars) to MessagePack; the response varies by Accept."""
+    return Response(content=msgpack.packb(content), media_type=MSGPACK_MEDIA_TYPE, headers={'Vary': 'Accept'})
+
+
+def negotiated_body(model: type[BaseModel]) -> Callable[[Request], Coroutine[Any, Any, BaseModel]]:
+    """
+    Return a dependency that validates the request body as the model from JSON or, if Content-Type says so,
+    from MessagePack; validation errors are reported as usual 422 responses.
+    """
+
+    async def parse_body(request: Request) -> BaseModel:
+        body = await request.body()
+        content_type = request.headers.get('Content-Type', '').partition(';')[0].strip().lower()
+        try:
+            if content_type in MSGPACK_MEDIA_TYPES:
+                return model.model_validate(msgpack.unpackb(body))
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            # ошибки в том же виде, что и при разборе тела самим FastAPI
+            errors = [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)]
+            raise RequestValidationError(errors, body=body) from e
+        except (ValueError, msgpack.UnpackException) as e:
+            raise RequestValidationError(
+                [{'type': 'body_decode_error', 'loc': ('body',), 'msg': 'Invalid MessagePack body', 'input': None}]
+            ) from e
+
+    return parse_body
+
+
+def negotiated_body_openapi(schema_name: str) -> dict:
+    """Return the openapi_extra describing a request body accepted both as JSON and as MessagePack."""
+    schema = {'$ref': f'#/components/schemas/{schema_name}'}
+    return {'requestBody': {
+        'required': True,
+        'content': {'application/json': {'schema': schema}, MSGPACK_MEDIA_TYPE: {'schema': schema}}
+    }}
@@ -0,0 +1,37 @@
+from sqlalchemy import Select, select, func, or_, case, literal
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_search_stmt(model, columns: list[InstrumentedAttribute], query: str, limit: int) -> Select:
+    """
+    Build a ranked search over the given text columns backed by pg_trgm GIN indexes.
+
+    A row matches when any column contains the query as a substring or is similar to it.
+    Rows whose columns start with the query are ranked first, then rows are ordered by the best
+    word similarity of their columns to the query.
+    """
+    query = query.strip()
+    pattern = escape_like(query)
+
+    matches = []
+    prefix_matches = []
+    similarities = []
+    for column in columns:
+        matches.append(column.ilike(f'%{pattern}%', escape='\\'))
+        matches.append(column.op('%')(query))
+        prefix_matches.append(column.ilike(f'{pattern}%', escape='\\'))
+        similarities.append(func.word_similarity(query, column))
+
+    prefix_rank = case((or_(*prefix_matches), literal(1)), else_=literal(0))
+    similarity_rank = func.greatest(*similarities) if len(similarities) > 1 else similarities[0]
+
+    return (
+        select(model)
+        .where(or_(*matches))
+        .order_by(prefix_rank.desc(), similarity_rank.desc(), model.id)
+        .limit(limit)
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import select, exists
+from sqlalchemy import select, exists, insert, update, delete
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import and_
 from typing import TypeVar, Generic
@@ -8,9 +8,17 @@ T = TypeVar('T')
 
 
 class SQLAlchemyRepository(AbstractRepository, Generic[T]):
-    def __init__(self, session: Session, model: T):
+    """
+    Repository with single-statement writes (INSERT/UPDATE/DELETE ... RETURNING).
+
+    With autocommit=False the write methods do not commit, so the caller can make many writes
+    in one transaction and commit the session once.
+    """
+
+    def __init__(self, session: Session, model: T, autocommit: bool = True):
         self.session: Session = session
         self.model: T = model
+        self.autocommit: bool = autocommit
 
     def get_all(self) -> list[T]:
         stmt = select(self.model)
@@ -22,32 +30,31 @@ class SQLAlchemyRepository(AbstractRepository, Generic[T]):
         return res
 
     def create(self, data: dict) -> T:
-        instance = self.model(**data)
-        self.session.add(instance)
-        self.session.commit()
-        self.session.refresh(instance)
+        stmt = insert(self.model).values(**data).returning(self.model)
+        instance = self.session.execute(stmt).scalar_one()
+        self._commit()
         return instance
 
     def update(self, _id: int, data: dict) -> T | None:
-        instance = self.get_by_id(_id)
-        if not instance:
-            return None
-
-        for key, value in data.items():
-            setattr(instance, key, value)
+        if not data:
+            return self.get_by_id(_id)
 
-        self.session.commit()
-        self.session.refresh(instance)
+        stmt = (
+            update(self.model)
+            .where(self.model.id == _id)
+            .values(**data)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        instance = self.session.execute(stmt).scalar_one_or_none()
+        self._commit()
         return instance
 
     def delete(self, _id: int) -> bool:
-        instance = self.get_by_id(_id)
-        if not instance:
-            return False
-
-        self.session.delete(instance)
-        self.session.commit()
-        return True
+        stmt = delete(self.model).where(self.model.id == _id).returning(self.model.id)
+        deleted = self.session.execute(stmt).scalar_one_or_none() is not None
+        self._commit()
+        return deleted
 
     def filter_by(self, **filters) -> list[T]:
         stmt = select(self.model).filter_by(**filters)
@@ -59,3 +66,7 @@ class SQLAlchemyRepository(AbstractRepository, Generic[T]):
         stmt = select(exists().where(and_(*conditions)))
         res = self.session.execute(stmt)
         return res.scalar()
+
+    def _commit(self) -> None:
+        if self.autocommit:
+            self.session.commit()
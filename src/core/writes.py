@@ -0,0 +1,58 @@
+from typing import Any
+from fastapi import HTTPException
+from sqlalchemy import insert, update, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# имя ограничения БД -> исключение, которое получит клиент при его нарушении
+ConstraintErrors = dict[str, type[HTTPException]]
+
+
+def _execute_write(session: Session, stmt, errors: ConstraintErrors) -> dict[str, Any] | None:
+    """
+    Execute the data-modifying statement and return the RETURNING row.
+    Unique and foreign key violations are translated into the exceptions registered for the constraint.
+    """
+    try:
+        row = session.execute(stmt).mappings().one_or_none()
+    except IntegrityError as e:
+        session.rollback()
+        constraint_name = getattr(getattr(e.orig, 'diag', None), 'constraint_name', None)
+        if constraint_name in errors:
+            raise errors[constraint_name]() from e
+        raise
+    return dict(row) if row is not None else None
+
+
+def insert_returning(
+        session: Session, model: type, values: dict[str, Any], errors: ConstraintErrors | None = None
+) -> dict[str, Any]:
+    """INSERT the row in a single statement, relying on DB constraints instead of pre-check queries."""
+    stmt = insert(model).values(**values).returning(*model.__table__.columns)
+    return _execute_write(session, stmt, errors or {})
+
+
+def update_returning(
+        session: Session,
+        model: type,
+        _id: int,
+        values: dict[str, Any],
+        not_found: type[HTTPException],
+        errors: ConstraintErrors | None = None
+) -> dict[str, Any]:
+    """UPDATE the row with the given id in a single statement; no matched row means it does not exist."""
+    if values:
+        stmt = (
+            update(model)
+            .where(model.id == _id)
+            .values(**values)
+            .returning(*model.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        stmt = select(*model.__table__.columns).where(model.id == _id)
+
+    row = _execute_write(session, stmt, errors or {})
+    if row is None:
+        raise not_found()
+    return row
@@ -4,8 +4,16 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+# журнал SQL включен по умолчанию для разработки, в production (gunicorn.conf.py) выключается
+DB_ECHO = os.getenv('DB_ECHO', '1') == '1'
+# размер пула на процесс; при запуске нескольких воркеров задается в gunicorn.conf.py
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+
 # Создаем engine из переменной окружения
-engine = create_engine(os.getenv('DATABASE_URL'), echo=True)
+engine = create_engine(
+    os.getenv('DATABASE_URL'), echo=DB_ECHO, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
+)
 
 # Создаем SessionLocal для dependency injection
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
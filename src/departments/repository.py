@@ -4,5 +4,5 @@ from .model import Department
 
 
 class DepartmentsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, Department)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, Department, autocommit)
@@ -1,14 +1,23 @@
 from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
+from src.maps.snapshots import invalidate_plan_snapshots
+from src.reference_data.snapshot import reference_data
 from src.exceptions import (
     DepartmentNotFoundException, DepartmentNameIsNotUniqueException, DepartmentShortNameIsNotUniqueException
 )
 from .model import Department
 from .schemas import DepartmentCreate, DepartmentUpdate, DepartmentRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'departments_name_key': DepartmentNameIsNotUniqueException,
+    'departments_short_name_key': DepartmentShortNameIsNotUniqueException,
+}
+
 router = APIRouter(
     prefix='/departments',
     tags=['departments']
@@ -25,7 +34,7 @@ router = APIRouter(
 )
 def get_department(department_id: Annotated[int, Path(gt=0)], session: SessionDep) -> DepartmentRead:
     """Return the department with the specified id"""
-    department = session.get(Department, department_id)
+    department = reference_data.get(session, Department, department_id)
     if not department:
         raise DepartmentNotFoundException()
     return department
@@ -44,26 +53,15 @@ def update_department(
         department_id: Annotated[int, Path(gt=0)], department_data: DepartmentUpdate, session: SessionDep
 ) -> DepartmentRead:
     """Update the department with the specified id with the given information (blank values are ignored)"""
-    department = session.get(Department, department_id)
-    if not department:
-        raise DepartmentNotFoundException()
-
-    if department_data.name:
-        stmt = select(exists().where(and_(Department.name == department_data.name, Department.id != department_id)))
-        if session.execute(stmt).scalar():
-            raise DepartmentNameIsNotUniqueException()
-
-    if department_data.short_name:
-        stmt = select(exists().where(
-            and_(Department.short_name == department_data.short_name, Department.id != department_id))
-        )
-        if session.execute(stmt).scalar():
-            raise DepartmentShortNameIsNotUniqueException()
-
-    for key, value in department_data.model_dump(exclude_none=True).items():
-        setattr(department, key, value)
+    department = update_returning(
+        session, Department, department_id, department_data.model_dump(exclude_none=True),
+        not_found=DepartmentNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    # данные входят в снимки планов направлений, они пересоберутся при следующем чтении
+    invalidate_plan_snapshots(session)
+    bump_table_revision(session, Department)
     session.commit()
-    session.refresh(department)
+    reference_data.invalidate(Department)
     return department
 
 
@@ -82,19 +80,21 @@ def delete_department(department_id: Annotated[int, Path(gt=0)], session: Sessio
     if not department:
         raise DepartmentNotFoundException()
     session.delete(department)
+    bump_table_revision(session, Department)
     session.commit()
+    reference_data.invalidate(Department)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get(
     '',
     responses={200: {'description': 'Departments successfully received'}},
+    response_model=list[DepartmentRead],
     summary='Return a list of departments'
 )
-def get_departments(session: SessionDep) -> list[DepartmentRead]:
+def get_departments(session: SessionDep) -> Response:
     """Return a list of departments."""
-    departments = session.execute(select(Department)).scalars()
-    return departments
+    return Response(content=reference_data.list_json(session, Department), media_type='application/json')
 
 
 @router.post(
@@ -109,16 +109,8 @@ def get_departments(session: SessionDep) -> list[DepartmentRead]:
 )
 def create_department(department_data: DepartmentCreate, session: SessionDep) -> Any:
     """Create the department with the given information."""
-    stmt = select(exists().where(Department.name == department_data.name))
-    if session.execute(stmt).scalar():
-        raise DepartmentNameIsNotUniqueException()
-
-    stmt = select(exists().where(Department.short_name == department_data.short_name))
-    if session.execute(stmt).scalar():
-        raise DepartmentShortNameIsNotUniqueException()
-
-    department = Department(**department_data.model_dump())
-    session.add(department)
+    department = insert_returning(session, Department, department_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, Department)
     session.commit()
-    session.refresh(department)
+    reference_data.invalidate(Department)
     return department
@@ -12,6 +12,9 @@ from src.departments.repository import DepartmentsRepository
 from src.control_types.repository import ControlTypesRepository
 from src.competencies.repository import CompetenciesRepository
 from src.maps.service import MapsService
+from src.competency_matrix.service import CompetencyMatrixService
+from src.competency_coverage.service import CompetencyCoverageService
+from src.teaching_load.service import TeachingLoadService
 from src.database import SessionLocal
 
 def get_db():
@@ -22,43 +25,45 @@ def get_db():
         db.close()
 
 def get_session() -> Session:
-    with Session(autoflush=False, bind=engine) as session:
+    # записи возвращают актуальные значения через RETURNING, поэтому после фиксации объекты не сбрасываются
+    with Session(autoflush=False, expire_on_commit=False, bind=engine) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
 
 
+# репозитории используются сервисами, которые сами фиксируют транзакцию один раз на операцию
 def get_directions_repository(session: SessionDep) -> DirectionsRepository:
-    return DirectionsRepository(session)
+    return DirectionsRepository(session, autocommit=False)
 
 
 DirectionsRepositoryDep = Annotated[DirectionsRepository, Depends(get_directions_repository)]
 
 
 def get_map_cors_repository(session: SessionDep) -> MapCorsRepository:
-    return MapCorsRepository(session)
+    return MapCorsRepository(session, autocommit=False)
 
 
 MapCorsRepositoryDep = Annotated[MapCorsRepository, Depends(get_map_cors_repository)]
 
 
 def get_direction_map_cors_repository(session: SessionDep) -> DirectionMapCorsRepository:
-    return DirectionMapCorsRepository(session)
+    return DirectionMapCorsRepository(session, autocommit=False)
 
 
 DirectionMapCorsRepositoryDep = Annotated[DirectionMapCorsRepository, Depends(get_direction_map_cors_repository)]
 
 
 def get_discipline_blocks_repository(session: SessionDep) -> DisciplineBlocksRepository:
-    return DisciplineBlocksRepository(session)
+    return DisciplineBlocksRepository(session, autocommit=False)
 
 
 DisciplineBlocksRepositoryDep = Annotated[DisciplineBlocksRepository, Depends(get_discipline_blocks_repository)]
 
 
 def get_discipline_block_competencies_repository(session: SessionDep) -> DisciplineBlockCompetenciesRepository:
-    return DisciplineBlockCompetenciesRepository(session)
+    return DisciplineBlockCompetenciesRepository(session, autocommit=False)
 
 
 DisciplineBlockCompetenciesRepositoryDep = Annotated[
@@ -67,28 +72,28 @@ DisciplineBlockCompetenciesRepositoryDep = Annotated[
 
 
 def get_disciplines_repository(session: SessionDep) -> DisciplinesRepository:
-    return DisciplinesRepository(session)
+    return DisciplinesRepository(session, autocommit=False)
 
 
 DisciplinesRepositoryDep = Annotated[DisciplinesRepository, Depends(get_disciplines_repository)]
 
 
 def get_departments_repository(session: SessionDep) -> DepartmentsRepository:
-    return DepartmentsRepository(session)
+    return DepartmentsRepository(session, autocommit=False)
 
 
 DepartmentsRepositoryDep = Annotated[DepartmentsRepository, Depends(get_departments_repository)]
 
 
 def get_control_types_repository(session: SessionDep) -> ControlTypesRepository:
-    return ControlTypesRepository(session)
+    return ControlTypesRepository(session, autocommit=False)
 
 
 ControlTypesRepositoryDep = Annotated[ControlTypesRepository, Depends(get_control_types_repository)]
 
 
 def get_competencies_repository(session: SessionDep) -> CompetenciesRepository:
-    return CompetenciesRepository(session)
+    return CompetenciesRepository(session, autocommit=False)
 
 
 CompetenciesRepositoryDep = Annotated[CompetenciesRepository, Depends(get_competencies_repository)]
@@ -119,3 +124,24 @@ def get_maps_service(
 
 
 MapsServiceDep = Annotated[MapsService, Depends(get_maps_service)]
+
+
+def get_competency_matrix_service(session: SessionDep) -> CompetencyMatrixService:
+    return CompetencyMatrixService(session)
+
+
+CompetencyMatrixServiceDep = Annotated[CompetencyMatrixService, Depends(get_competency_matrix_service)]
+
+
+def get_competency_coverage_service(session: SessionDep) -> CompetencyCoverageService:
+    return CompetencyCoverageService(session)
+
+
+CompetencyCoverageServiceDep = Annotated[CompetencyCoverageService, Depends(get_competency_coverage_service)]
+
+
+def get_teaching_load_service(session: SessionDep) -> TeachingLoadService:
+    return TeachingLoadService(session)
+
+
+TeachingLoadServiceDep = Annotated[TeachingLoadService, Depends(get_teaching_load_service)]
@@ -9,5 +9,5 @@ class DirectionMapCore(Base):
     __tablename__ = 'direction_map_cors'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    direction_id: Mapped[int] = mapped_column(Integer, ForeignKey('directions.id'))
-    map_core_id: Mapped[int] = mapped_column(Integer, ForeignKey('map_cors.id'))
+    direction_id: Mapped[int] = mapped_column(Integer, ForeignKey('directions.id'), index=True)
+    map_core_id: Mapped[int] = mapped_column(Integer, ForeignKey('map_cors.id'), index=True)
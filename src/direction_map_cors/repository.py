@@ -4,5 +4,5 @@ from .model import DirectionMapCore
 
 
 class DirectionMapCorsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, DirectionMapCore)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, DirectionMapCore, autocommit)
@@ -2,13 +2,19 @@ from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
 from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
 from src.dependencies import SessionDep
 from src.exceptions import DirectionMapCoreNotFoundException, DirectionNotFoundException, MapCoreNotFoundException
+from src.maps.revisions import bump_edited_plan_versions
 from .model import DirectionMapCore
-from src.map_cors.model import MapCore
-from src.directions.model import Direction
 from .schemas import DirectionMapCoreCreate, DirectionMapCoreUpdate, DirectionMapCoreRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'direction_map_cors_direction_id_fkey': DirectionNotFoundException,
+    'direction_map_cors_map_core_id_fkey': MapCoreNotFoundException,
+}
+
 router = APIRouter(
     prefix='/direction-map-cors',
     tags=['direction map cors']
@@ -54,18 +60,13 @@ def update_direction_map_core(
     if not direction_map_core:
         raise DirectionMapCoreNotFoundException()
 
-    if direction_map_core.direction_id:
-        if not session.get(Direction, direction_map_core_data.direction_id):
-            raise DirectionNotFoundException()
-
-    if direction_map_core.map_core_id:
-        if not session.get(MapCore, direction_map_core_data.map_core_id):
-            raise MapCoreNotFoundException()
-
-    for key, value in direction_map_core_data.model_dump(exclude_none=True).items():
-        setattr(direction_map_core, key, value)
+    old_direction_id = direction_map_core.direction_id
+    direction_map_core = update_returning(
+        session, DirectionMapCore, direction_map_core_id, direction_map_core_data.model_dump(exclude_none=True),
+        not_found=DirectionMapCoreNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_edited_plan_versions(session, old_direction_id, direction_map_core['direction_id'])
     session.commit()
-    session.refresh(direction_map_core)
     return direction_map_core
 
 
@@ -86,6 +87,7 @@ def delete_direction_map_core(
     if not direction_map_core:
         raise DirectionMapCoreNotFoundException()
     session.delete(direction_map_core)
+    bump_edited_plan_versions(session, direction_map_core.direction_id)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -115,14 +117,9 @@ def create_direction_map_core(
         direction_map_core_data: DirectionMapCoreCreate, session: SessionDep
 ) -> Any:
     """Create the direction map core with the given information."""
-    if not session.get(Direction, direction_map_core_data.direction_id):
-        raise DirectionNotFoundException()
-
-    if not session.get(MapCore, direction_map_core_data.map_core_id):
-        raise MapCoreNotFoundException()
-
-    direction_map_core = DirectionMapCore(**direction_map_core_data.model_dump())
-    session.add(direction_map_core)
+    direction_map_core = insert_returning(
+        session, DirectionMapCore, direction_map_core_data.model_dump(), CONSTRAINT_ERRORS
+    )
+    bump_edited_plan_versions(session, direction_map_core['direction_id'])
     session.commit()
-    session.refresh(direction_map_core)
     return direction_map_core
@@ -12,3 +12,4 @@ class Direction(Base):
     educational_level_id: Mapped[int] = mapped_column(Integer, ForeignKey('educational_levels.id'))
     educational_form_id: Mapped[int] = mapped_column(Integer, ForeignKey('educational_forms.id'))
     semester_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    plan_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
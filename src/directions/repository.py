@@ -4,5 +4,5 @@ from .model import Direction
 
 
 class DirectionsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, Direction)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, Direction, autocommit)
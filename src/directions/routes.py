@@ -2,15 +2,21 @@ from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
 from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
 from src.exceptions import (
     DirectionNotFoundException, EducationalLevelNotFoundException, EducationalFormNotFoundException
 )
-from src.educational_levels.model import EducationalLevel
-from src.educational_forms.model import EducationalForm
 from .model import Direction
 from .schemas import DirectionCreate, DirectionUpdate, DirectionRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'directions_educational_level_id_fkey': EducationalLevelNotFoundException,
+    'directions_educational_form_id_fkey': EducationalFormNotFoundException,
+}
+
 router = APIRouter(
     prefix='/directions',
     tags=['directions']
@@ -42,22 +48,12 @@ def update_direction(
         direction_id: Annotated[int, Path(gt=0)], direction_data: DirectionUpdate, session: SessionDep
 ) -> DirectionRead:
     """Update the direction with the specified id with the given information (blank values are ignored)"""
-    direction = session.get(Direction, direction_id)
-    if not direction:
-        raise DirectionNotFoundException()
-
-    if direction.educational_level_id:
-        if not session.get(EducationalLevel, direction_data.educational_level_id):
-            raise EducationalLevelNotFoundException()
-
-    if direction.educational_form_id:
-        if not session.get(EducationalForm, direction_data.educational_form_id):
-            raise EducationalFormNotFoundException()
-
-    for key, value in direction_data.model_dump(exclude_none=True).items():
-        setattr(direction, key, value)
+    direction = update_returning(
+        session, Direction, direction_id, direction_data.model_dump(exclude_none=True),
+        not_found=DirectionNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_table_revision(session, Direction)
     session.commit()
-    session.refresh(direction)
     return direction
 
 
@@ -76,6 +72,7 @@ def delete_direction(direction_id: Annotated[int, Path(gt=0)], session: SessionD
     if not direction:
         raise DirectionNotFoundException()
     session.delete(direction)
+    bump_table_revision(session, Direction)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -103,14 +100,7 @@ def get_directions(session: SessionDep) -> list[DirectionRead]:
 )
 def create_direction(direction_data: DirectionCreate, session: SessionDep) -> Any:
     """Create the direction with the given information."""
-    if not session.get(EducationalLevel, direction_data.educational_level_id):
-        raise EducationalLevelNotFoundException()
-
-    if not session.get(EducationalForm, direction_data.educational_form_id):
-        raise EducationalFormNotFoundException()
-
-    direction = Direction(**direction_data.model_dump())
-    session.add(direction)
+    direction = insert_returning(session, Direction, direction_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, Direction)
     session.commit()
-    session.refresh(direction)
     return direction
@@ -4,5 +4,5 @@ from .model import DisciplineBlockActivityType
 
 
 class DisciplineBlockActivityTypesRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, DisciplineBlockActivityType)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, DisciplineBlockActivityType, autocommit)
@@ -4,5 +4,5 @@ from .model import DisciplineBlockCompetency
 
 
 class DisciplineBlockCompetenciesRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, DisciplineBlockCompetency)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, DisciplineBlockCompetency, autocommit)
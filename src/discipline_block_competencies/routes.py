@@ -2,15 +2,21 @@ from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
 from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
 from src.dependencies import SessionDep
 from src.exceptions import (
     DisciplineBlockCompetencyNotFoundException, DisciplineBlockNotFoundException, CompetencyNotFoundException
 )
-from src.competencies.model import Competency
+from src.maps.revisions import bump_discipline_blocks_plan_versions
 from .model import DisciplineBlockCompetency
-from src.discipline_blocks.model import DisciplineBlock
 from .schemas import DisciplineBlockCompetencyCreate, DisciplineBlockCompetencyUpdate, DisciplineBlockCompetencyRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'discipline_block_competencies_discipline_block_id_fkey': DisciplineBlockNotFoundException,
+    'discipline_block_competencies_competency_id_fkey': CompetencyNotFoundException,
+}
+
 router = APIRouter(
     prefix='/discipline-block-competencies',
     tags=['discipline block competencies']
@@ -56,18 +62,16 @@ def update_discipline_block_competency(
     if not discipline_block_competency:
         raise DisciplineBlockCompetencyNotFoundException()
 
-    if discipline_block_competency.discipline_block_id:
-        if not session.get(DisciplineBlock, discipline_block_competency_data.discipline_block_id):
-            raise DisciplineBlockNotFoundException()
-
-    if discipline_block_competency.competency_id:
-        if not session.get(Competency, discipline_block_competency_data.competency_id):
-            raise CompetencyNotFoundException()
-
-    for key, value in discipline_block_competency_data.model_dump(exclude_none=True).items():
-        setattr(discipline_block_competency, key, value)
+    old_discipline_block_id = discipline_block_competency.discipline_block_id
+    discipline_block_competency = update_returning(
+        session, DisciplineBlockCompetency, discipline_block_competency_id,
+        discipline_block_competency_data.model_dump(exclude_none=True),
+        not_found=DisciplineBlockCompetencyNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_discipline_blocks_plan_versions(
+        session, old_discipline_block_id, discipline_block_competency['discipline_block_id']
+    )
     session.commit()
-    session.refresh(discipline_block_competency)
     return discipline_block_competency
 
 
@@ -88,6 +92,7 @@ def delete_discipline_block_competency(
     if not discipline_block_competency:
         raise DisciplineBlockCompetencyNotFoundException()
     session.delete(discipline_block_competency)
+    bump_discipline_blocks_plan_versions(session, discipline_block_competency.discipline_block_id)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -117,14 +122,9 @@ def create_discipline_block_competency(
         discipline_block_competency_data: DisciplineBlockCompetencyCreate, session: SessionDep
 ) -> Any:
     """Create the discipline block competency with the given information."""
-    if not session.get(DisciplineBlock, discipline_block_competency_data.discipline_block_id):
-        raise DisciplineBlockNotFoundException()
-
-    if not session.get(Competency, discipline_block_competency_data.competency_id):
-        raise CompetencyNotFoundException()
-
-    discipline_block_competency = DisciplineBlockCompetency(**discipline_block_competency_data.model_dump())
-    session.add(discipline_block_competency)
+    discipline_block_competency = insert_returning(
+        session, DisciplineBlockCompetency, discipline_block_competency_data.model_dump(), CONSTRAINT_ERRORS
+    )
+    bump_discipline_blocks_plan_versions(session, discipline_block_competency['discipline_block_id'])
     session.commit()
-    session.refresh(discipline_block_competency)
     return discipline_block_competency
@@ -16,4 +16,4 @@ class DisciplineBlock(Base):
     practice_hours: Mapped[int] = mapped_column(Integer, nullable=False)
     lab_hours: Mapped[int] = mapped_column(Integer, nullable=False)
     semester_number: Mapped[int] = mapped_column(Integer, nullable=False)
-    map_core_id: Mapped[int] = mapped_column(Integer, ForeignKey('map_cors.id'))
+    map_core_id: Mapped[int] = mapped_column(Integer, ForeignKey('map_cors.id'), index=True)
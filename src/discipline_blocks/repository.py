@@ -4,5 +4,5 @@ from .model import DisciplineBlock
 
 
 class DisciplineBlocksRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, DisciplineBlock)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, DisciplineBlock, autocommit)
@@ -2,17 +2,23 @@ from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
 from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
 from src.dependencies import SessionDep
 from src.exceptions import (
     DisciplineBlockNotFoundException, DisciplineNotFoundException, ControlTypeNotFoundException,
     MapCoreNotFoundException
 )
-from src.control_types.model import ControlType
-from src.disciplines.model import Discipline
+from src.maps.revisions import bump_map_cors_plan_versions
 from .model import DisciplineBlock
-from src.map_cors.model import MapCore
 from .schemas import DisciplineBlockCreate, DisciplineBlockUpdate, DisciplineBlockRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'discipline_blocks_discipline_id_fkey': DisciplineNotFoundException,
+    'discipline_blocks_control_type_id_fkey': ControlTypeNotFoundException,
+    'discipline_blocks_map_core_id_fkey': MapCoreNotFoundException,
+}
+
 router = APIRouter(
     prefix='/discipline-blocks',
     tags=['discipline blocks']
@@ -53,22 +59,13 @@ def update_discipline_block(
     if not discipline_block:
         raise DisciplineBlockNotFoundException()
 
-    if discipline_block_data.discipline_id:
-        if not session.get(Discipline, discipline_block_data.discipline_id):
-            raise DisciplineNotFoundException()
-
-    if discipline_block_data.control_type_id:
-        if not session.get(ControlType, discipline_block_data.control_type_id):
-            raise ControlTypeNotFoundException()
-
-    if discipline_block_data.map_core_id:
-        if not session.get(MapCore, discipline_block_data.map_core_id):
-            raise MapCoreNotFoundException()
-
-    for key, value in discipline_block_data.model_dump(exclude_none=True).items():
-        setattr(discipline_block, key, value)
+    old_map_core_id = discipline_block.map_core_id
+    discipline_block = update_returning(
+        session, DisciplineBlock, discipline_block_id, discipline_block_data.model_dump(exclude_none=True),
+        not_found=DisciplineBlockNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_map_cors_plan_versions(session, old_map_core_id, discipline_block['map_core_id'])
     session.commit()
-    session.refresh(discipline_block)
     return discipline_block
 
 
@@ -87,6 +84,7 @@ def delete_discipline_block(discipline_block_id: Annotated[int, Path(gt=0)], ses
     if not discipline_block:
         raise DisciplineBlockNotFoundException()
     session.delete(discipline_block)
+    bump_map_cors_plan_versions(session, discipline_block.map_core_id)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -114,18 +112,9 @@ def get_discipline_blocks(session: SessionDep) -> list[DisciplineBlockRead]:
 )
 def create_discipline_block(discipline_block_data: DisciplineBlockCreate, session: SessionDep) -> Any:
     """Create the discipline block with the given information."""
-
-    if not session.get(Discipline, discipline_block_data.discipline_id):
-        raise DisciplineNotFoundException()
-
-    if not session.get(ControlType, discipline_block_data.control_type_id):
-        raise ControlTypeNotFoundException()
-
-    if not session.get(MapCore, discipline_block_data.map_core_id):
-        raise MapCoreNotFoundException()
-
-    discipline_block = DisciplineBlock(**discipline_block_data.model_dump())
-    session.add(discipline_block)
+    discipline_block = insert_returning(
+        session, DisciplineBlock, discipline_block_data.model_dump(), CONSTRAINT_ERRORS
+    )
+    bump_map_cors_plan_versions(session, discipline_block['map_core_id'])
     session.commit()
-    session.refresh(discipline_block)
     return discipline_block
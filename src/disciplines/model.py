@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Integer, String, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.core.base_model import Base
 
@@ -6,6 +6,13 @@ from src.core.base_model import Base
 class Discipline(Base):
     """Дисциплины."""
     __tablename__ = 'disciplines'
+    __table_args__ = (
+        Index('ix_disciplines_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index(
+            'ix_disciplines_short_name_trgm', 'short_name',
+            postgresql_using='gin', postgresql_ops={'short_name': 'gin_trgm_ops'}
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
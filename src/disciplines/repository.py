@@ -4,5 +4,5 @@ from .model import Discipline
 
 
 class DisciplinesRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, Discipline)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, Discipline, autocommit)
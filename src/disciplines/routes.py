@@ -1,22 +1,47 @@
-from fastapi import APIRouter, status, Path
+from fastapi import APIRouter, status, Path, Query
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
+from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.search import build_search_stmt
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
+from src.maps.snapshots import invalidate_plan_snapshots
 from src.exceptions import (
     DisciplineNotFoundException, DisciplineNameIsNotUniqueException, DisciplineShortNameIsNotUniqueException,
     DepartmentNotFoundException
 )
-from src.departments.model import Department
 from .model import Discipline
 from .schemas import DisciplineCreate, DisciplineUpdate, DisciplineRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'disciplines_name_key': DisciplineNameIsNotUniqueException,
+    'disciplines_short_name_key': DisciplineShortNameIsNotUniqueException,
+    'disciplines_department_id_fkey': DepartmentNotFoundException,
+}
+
 router = APIRouter(
     prefix='/disciplines',
     tags=['disciplines']
 )
 
 
+@router.get(
+    '/search',
+    responses={200: {'description': 'Disciplines successfully found'}},
+    summary='Search disciplines'
+)
+def search_disciplines(
+        q: Annotated[str, Query(min_length=1, max_length=255, pattern=r'\S')],
+        session: SessionDep,
+        limit: Annotated[int, Query(ge=1, le=100)] = 20
+) -> list[DisciplineRead]:
+    """Return disciplines matching the query by name and short name, ranked by prefix match and similarity."""
+    stmt = build_search_stmt(Discipline, [Discipline.name, Discipline.short_name], q, limit)
+    return session.execute(stmt).scalars()
+
+
 @router.get(
     '/{discipline_id}',
     responses={200: {'description': 'Discipline successfully received'}, 404: {'description': 'Discipline not found'}},
@@ -43,30 +68,14 @@ def update_discipline(
         discipline_id: Annotated[int, Path(gt=0)], discipline_data: DisciplineUpdate, session: SessionDep
 ) -> DisciplineRead:
     """Update the discipline with the specified id with the given information (blank values are ignored)"""
-    discipline = session.get(Discipline, discipline_id)
-    if not discipline:
-        raise DisciplineNotFoundException()
-
-    if discipline_data.name:
-        stmt = select(exists().where(and_(Discipline.name == discipline_data.name, Discipline.id != discipline_id)))
-        if session.execute(stmt).scalar():
-            raise DisciplineNameIsNotUniqueException()
-
-    if discipline_data.short_name:
-        stmt = select(exists().where(and_(
-            Discipline.short_name == discipline_data.short_name, Discipline.id != discipline_id
-        )))
-        if session.execute(stmt).scalar():
-            raise DisciplineShortNameIsNotUniqueException()
-
-    if discipline_data.department_id:
-        if not session.get(Department, discipline_data.department_id):
-            raise DepartmentNotFoundException()
-
-    for key, value in discipline_data.model_dump(exclude_none=True).items():
-        setattr(discipline, key, value)
+    discipline = update_returning(
+        session, Discipline, discipline_id, discipline_data.model_dump(exclude_none=True),
+        not_found=DisciplineNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    # данные входят в снимки планов направлений, они пересоберутся при следующем чтении
+    invalidate_plan_snapshots(session)
+    bump_table_revision(session, Discipline)
     session.commit()
-    session.refresh(discipline)
     return discipline
 
 
@@ -85,6 +94,7 @@ def delete_discipline(discipline_id: Annotated[int, Path(gt=0)], session: Sessio
     if not discipline:
         raise DisciplineNotFoundException()
     session.delete(discipline)
+    bump_table_revision(session, Discipline)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -113,20 +123,7 @@ def get_disciplines(session: SessionDep) -> list[DisciplineRead]:
 )
 def create_discipline(discipline_data: DisciplineCreate, session: SessionDep) -> Any:
     """Create the discipline with the given information."""
-
-    stmt = select(exists().where(Discipline.name == discipline_data.name))
-    if session.execute(stmt).scalar():
-        raise DisciplineNameIsNotUniqueException()
-
-    stmt = select(exists().where(Discipline.short_name == discipline_data.short_name))
-    if session.execute(stmt).scalar():
-        raise DisciplineShortNameIsNotUniqueException()
-
-    if not session.get(Department, discipline_data.department_id):
-        raise DepartmentNotFoundException()
-
-    discipline = Discipline(**discipline_data.model_dump())
-    session.add(discipline)
+    discipline = insert_returning(session, Discipline, discipline_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, Discipline)
     session.commit()
-    session.refresh(discipline)
     return discipline
@@ -4,5 +4,5 @@ from .model import EducationalForm
 
 
 class EducationalFormsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, EducationalForm)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, EducationalForm, autocommit)
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
+from src.reference_data.snapshot import reference_data
 from src.exceptions import EducationalFormNotFoundException, EducationalFormNameIsNotUniqueException
 from .model import EducationalForm
 from .schemas import EducationalFormCreate, EducationalFormUpdate, EducationalFormRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'educational_forms_name_key': EducationalFormNameIsNotUniqueException,
+}
+
 router = APIRouter(
     prefix='/educational-forms',
     tags=['educational forms']
@@ -25,7 +32,7 @@ def get_educational_form(
         educational_form_id: Annotated[int, Path(gt=0)], session: SessionDep
 ) -> EducationalFormRead:
     """Return the educational form with the specified id"""
-    educational_form = session.get(EducationalForm, educational_form_id)
+    educational_form = reference_data.get(session, EducationalForm, educational_form_id)
     if not educational_form:
         raise EducationalFormNotFoundException()
     return educational_form
@@ -46,21 +53,13 @@ def update_educational_form(
         session: SessionDep
 ) -> EducationalFormRead:
     """Update the educational form with the specified id with the given information (blank values are ignored)"""
-    educational_form = session.get(EducationalForm, educational_form_id)
-    if not educational_form:
-        raise EducationalFormNotFoundException()
-
-    if educational_form_data.name:
-        stmt = select(exists().where(and_(
-            EducationalForm.name == educational_form_data.name, EducationalForm.id != educational_form_id
-        )))
-        if session.execute(stmt).scalar():
-            raise EducationalFormNameIsNotUniqueException()
-
-    for key, value in educational_form_data.model_dump(exclude_none=True).items():
-        setattr(educational_form, key, value)
+    educational_form = update_returning(
+        session, EducationalForm, educational_form_id, educational_form_data.model_dump(exclude_none=True),
+        not_found=EducationalFormNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_table_revision(session, EducationalForm)
     session.commit()
-    session.refresh(educational_form)
+    reference_data.invalidate(EducationalForm)
     return educational_form
 
 
@@ -79,19 +78,21 @@ def delete_educational_form(educational_form_id: Annotated[int, Path(gt=0)], ses
     if not educational_form:
         raise EducationalFormNotFoundException()
     session.delete(educational_form)
+    bump_table_revision(session, EducationalForm)
     session.commit()
+    reference_data.invalidate(EducationalForm)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get(
     '',
     responses={200: {'description': 'Educational forms successfully received'}},
+    response_model=list[EducationalFormRead],
     summary='Return a list of educational forms'
 )
-def get_educational_forms(session: SessionDep) -> list[EducationalFormRead]:
+def get_educational_forms(session: SessionDep) -> Response:
     """Return a list of educational forms."""
-    educational_forms = session.execute(select(EducationalForm)).scalars()
-    return educational_forms
+    return Response(content=reference_data.list_json(session, EducationalForm), media_type='application/json')
 
 
 @router.post(
@@ -106,12 +107,8 @@ def get_educational_forms(session: SessionDep) -> list[EducationalFormRead]:
 )
 def create_educational_form(educational_form_data: EducationalFormCreate, session: SessionDep) -> Any:
     """Create the educational form with the given information."""
-    stmt = select(exists().where(EducationalForm.name == educational_form_data.name))
-    if session.execute(stmt).scalar():
-        raise EducationalFormNameIsNotUniqueException()
-
-    educational_form = EducationalForm(**educational_form_data.model_dump())
-    session.add(educational_form)
+    educational_form = insert_returning(session, EducationalForm, educational_form_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, EducationalForm)
     session.commit()
-    session.refresh(educational_form)
+    reference_data.invalidate(EducationalForm)
     return educational_form
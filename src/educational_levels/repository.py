@@ -4,5 +4,5 @@ from .model import EducationalLevel
 
 
 class EducationalLevelsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, EducationalLevel)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, EducationalLevel, autocommit)
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, status, Path
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
+from src.reference_data.snapshot import reference_data
 from src.exceptions import EducationalLevelNotFoundException, EducationalLevelNameIsNotUniqueException
 from .model import EducationalLevel
 from .schemas import EducationalLevelCreate, EducationalLevelUpdate, EducationalLevelRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'educational_levels_name_key': EducationalLevelNameIsNotUniqueException,
+}
+
 router = APIRouter(
     prefix='/educational-levels',
     tags=['educational levels']
@@ -25,7 +32,7 @@ def get_educational_level(
         educational_level_id: Annotated[int, Path(gt=0)], session: SessionDep
 ) -> EducationalLevelRead:
     """Return the educational level with the specified id"""
-    educational_level = session.get(EducationalLevel, educational_level_id)
+    educational_level = reference_data.get(session, EducationalLevel, educational_level_id)
     if not educational_level:
         raise EducationalLevelNotFoundException()
     return educational_level
@@ -46,21 +53,13 @@ def update_educational_level(
         session: SessionDep
 ) -> EducationalLevelRead:
     """Update the educational level with the specified id with the given information (blank values are ignored)"""
-    educational_level = session.get(EducationalLevel, educational_level_id)
-    if not educational_level:
-        raise EducationalLevelNotFoundException()
-
-    if educational_level_data.name:
-        stmt = select(exists().where(and_(
-            EducationalLevel.name == educational_level_data.name, EducationalLevel.id != educational_level_id
-        )))
-        if session.execute(stmt).scalar():
-            raise EducationalLevelNameIsNotUniqueException()
-
-    for key, value in educational_level_data.model_dump(exclude_none=True).items():
-        setattr(educational_level, key, value)
+    educational_level = update_returning(
+        session, EducationalLevel, educational_level_id, educational_level_data.model_dump(exclude_none=True),
+        not_found=EducationalLevelNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_table_revision(session, EducationalLevel)
     session.commit()
-    session.refresh(educational_level)
+    reference_data.invalidate(EducationalLevel)
     return educational_level
 
 
@@ -79,19 +78,21 @@ def delete_educational_level(educational_level_id: Annotated[int, Path(gt=0)], s
     if not educational_level:
         raise EducationalLevelNotFoundException()
     session.delete(educational_level)
+    bump_table_revision(session, EducationalLevel)
     session.commit()
+    reference_data.invalidate(EducationalLevel)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get(
     '',
     responses={200: {'description': 'Educational levels successfully received'}},
+    response_model=list[EducationalLevelRead],
     summary='Return a list of educational levels'
 )
-def get_educational_levels(session: SessionDep) -> list[EducationalLevelRead]:
+def get_educational_levels(session: SessionDep) -> Response:
     """Return a list of educational levels."""
-    educational_levels = session.execute(select(EducationalLevel)).scalars()
-    return educational_levels
+    return Response(content=reference_data.list_json(session, EducationalLevel), media_type='application/json')
 
 
 @router.post(
@@ -106,12 +107,8 @@ def get_educational_levels(session: SessionDep) -> list[EducationalLevelRead]:
 )
 def create_educational_level(educational_level_data: EducationalLevelCreate, session: SessionDep) -> Any:
     """Create the educational level with the given information."""
-    stmt = select(exists().where(EducationalLevel.name == educational_level_data.name))
-    if session.execute(stmt).scalar():
-        raise EducationalLevelNameIsNotUniqueException()
-
-    educational_level = EducationalLevel(**educational_level_data.model_dump())
-    session.add(educational_level)
+    educational_level = insert_returning(session, EducationalLevel, educational_level_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, EducationalLevel)
     session.commit()
-    session.refresh(educational_level)
+    reference_data.invalidate(EducationalLevel)
     return educational_level
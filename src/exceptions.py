@@ -207,3 +207,35 @@ class MapCoreNotFoundException(HTTPException):
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Ядро карты с указанным id не найдено.'
         )
+
+
+class MapCloneSourceIsTargetException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Нельзя скопировать карту направления подготовки саму в себя.'
+        )
+
+
+class PlanVersionNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Версия карты направления подготовки с указанным номером не найдена.'
+        )
+
+
+class MapSaveLockTimeoutException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Карта направления подготовки сохраняется другим пользователем, повторите попытку позже.'
+        )
+
+
+class PlanVersionConflictException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Карта направления подготовки была изменена после ее загрузки, обновите ее и повторите попытку.'
+        )
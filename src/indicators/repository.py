@@ -4,5 +4,5 @@ from .model import Indicator
 
 
 class IndicatorsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, Indicator)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, Indicator, autocommit)
@@ -1,20 +1,43 @@
-from fastapi import APIRouter, status, Path
+from fastapi import APIRouter, status, Path, Query
 from fastapi.responses import Response
-from sqlalchemy import select, exists, and_
+from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.search import build_search_stmt
+from src.core.writes import insert_returning, update_returning
+from src.table_revisions.revisions import bump_table_revision
 from src.dependencies import SessionDep
 from src.exceptions import (
     IndicatorNotFoundException, IndicatorCodeIsNotUniqueException, CompetencyNotFoundException)
 from .model import Indicator
-from src.competencies.model import Competency
 from .schemas import IndicatorCreate, IndicatorUpdate, IndicatorRead
 
+# нарушения ограничений БД при записи -> ответы клиенту
+CONSTRAINT_ERRORS = {
+    'indicators_code_key': IndicatorCodeIsNotUniqueException,
+    'indicators_competency_id_fkey': CompetencyNotFoundException,
+}
+
 router = APIRouter(
     prefix='/indicators',
     tags=['indicators']
 )
 
 
+@router.get(
+    '/search',
+    responses={200: {'description': 'Indicators successfully found'}},
+    summary='Search indicators'
+)
+def search_indicators(
+        q: Annotated[str, Query(min_length=1, max_length=255, pattern=r'\S')],
+        session: SessionDep,
+        limit: Annotated[int, Query(ge=1, le=100)] = 20
+) -> list[IndicatorRead]:
+    """Return indicators matching the query by code and name, ranked by prefix match and similarity."""
+    stmt = build_search_stmt(Indicator, [Indicator.code, Indicator.name], q, limit)
+    return session.execute(stmt).scalars()
+
+
 @router.get(
     '/{indicator_id}',
     responses={
@@ -44,24 +67,12 @@ def update_indicator(
         indicator_id: Annotated[int, Path(gt=0)], indicator_data: IndicatorUpdate, session: SessionDep
 ) -> IndicatorRead:
     """Update the indicator with the specified id with the given information (blank values are ignored)"""
-    indicator = session.get(Indicator, indicator_id)
-    if not indicator:
-        raise IndicatorNotFoundException()
-
-    if indicator_data.code:
-        stmt = select(exists().where(and_(Indicator.code == indicator_data.code, Indicator.id != indicator_id)))
-        if session.execute(stmt).scalar():
-            raise IndicatorCodeIsNotUniqueException()
-
-    if indicator_data.competency_id:
-        competency = session.get(Competency, indicator_data.competency_id)
-        if not competency:
-            raise CompetencyNotFoundException()
-
-    for key, value in indicator_data.model_dump(exclude_none=True).items():
-        setattr(indicator, key, value)
+    indicator = update_returning(
+        session, Indicator, indicator_id, indicator_data.model_dump(exclude_none=True),
+        not_found=IndicatorNotFoundException, errors=CONSTRAINT_ERRORS
+    )
+    bump_table_revision(session, Indicator)
     session.commit()
-    session.refresh(indicator)
     return indicator
 
 
@@ -80,6 +91,7 @@ def delete_indicator(indicator_id: Annotated[int, Path(gt=0)], session: SessionD
     if not indicator:
         raise IndicatorNotFoundException()
     session.delete(indicator)
+    bump_table_revision(session, Indicator)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -108,16 +120,7 @@ def get_indicators(session: SessionDep) -> list[IndicatorRead]:
 )
 def create_indicator(indicator_data: IndicatorCreate, session: SessionDep) -> Any:
     """Create the indicator with the given information."""
-    stmt = select(exists().where(Indicator.code == indicator_data.code))
-    if session.execute(stmt).scalar():
-        raise IndicatorCodeIsNotUniqueException()
-
-    competency = session.get(Competency, indicator_data.competency_id)
-    if not competency:
-        raise CompetencyNotFoundException()
-
-    indicator = Indicator(**indicator_data.model_dump())
-    session.add(indicator)
+    indicator = insert_returning(session, Indicator, indicator_data.model_dump(), CONSTRAINT_ERRORS)
+    bump_table_revision(session, Indicator)
     session.commit()
-    session.refresh(indicator)
     return indicator
@@ -1,5 +1,8 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from src.educational_levels.routes import router as educational_levels_router
 from src.educational_forms.routes import router as educational_forms_router
 from src.directions.routes import router as directions_router
@@ -17,12 +20,47 @@ from src.discipline_block_competencies.routes import router as discipline_block_
 from src.validations.routes import router as validations_router
 from src.maps.routes import router as maps_router
 from src.maps import routes as plan_routes  # NEW NEW NEW
+from src.competency_matrix.routes import router as competency_matrix_router
+from src.competency_coverage.routes import router as competency_coverage_router
+from src.teaching_load.routes import router as teaching_load_router
 
 from src.calendar_plans import router as calendar_plans_router
+from sqlalchemy.orm import configure_mappers
+from src.core.compression import CompressionMiddleware
+from src.database import SessionLocal, engine
+from src.reference_data.snapshot import reference_data
+from src.maps.events import listen_plan_changes
+from src.monitoring.db import instrument_engine
+from src.monitoring.debug import QueryDebugMiddleware, DB_QUERY_DEBUG
+from src.monitoring.middleware import MetricsMiddleware
+from src.monitoring.routes import router as monitoring_router
 
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # связи моделей настраиваются при старте, а не при первом запросе к БД
+    configure_mappers()
+    # справочники загружаются в память один раз при старте, дальше обновляются CRUD-роутами
+    with SessionLocal() as session:
+        reference_data.load(session)
+    # уведомления об изменении планов из всех воркеров раздаются подписчикам SSE этого процесса
+    plan_changes_listener = asyncio.create_task(listen_plan_changes(engine))
+    yield
+    plan_changes_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await plan_changes_listener
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+instrument_engine(engine)
+
+# сжатие - внутренний слой, поэтому метрики учитывают размер ответа после сжатия
+app.add_middleware(CompressionMiddleware)
+if DB_QUERY_DEBUG:
+    app.add_middleware(QueryDebugMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['X-DB-Queries', 'X-DB-Time'],
 )
 app.include_router(plan_routes.router) ## NEW NEW NEW
 app.include_router(educational_levels_router)
@@ -48,5 +87,9 @@ app.include_router(discipline_blocks_router)
 app.include_router(discipline_block_competencies_router)
 app.include_router(validations_router)
 app.include_router(maps_router)
+app.include_router(competency_matrix_router)
+app.include_router(competency_coverage_router)
+app.include_router(teaching_load_router)
 
-app.include_router(calendar_plans_router)
\ No newline at end of file
+app.include_router(calendar_plans_router)
+app.include_router(monitoring_router)
@@ -0,0 +1,109 @@
+"""
+Garbage collection of map cores that are no longer linked to any direction
+(load_map unlinks the previous cores of the direction but leaves them in the database).
+
+    python -m src.map_cors.gc --batch-size 500
+"""
+import argparse
+import logging
+from sqlalchemy import select, delete, exists
+from sqlalchemy.orm import Session
+from src.database import SessionLocal
+from src.direction_map_cors.model import DirectionMapCore
+from src.discipline_blocks.model import DisciplineBlock
+from src.discipline_block_competencies.model import DisciplineBlockCompetency
+from src.discipline_block_activity_types.model import DisciplineBlockActivityType
+# модели, на которые ссылаются relationship() остальных моделей
+from src.activity_types.model import ActivityType  # noqa: F401
+from src.competencies.model import Competency  # noqa: F401
+from src.competency_groups.model import CompetencyGroup  # noqa: F401
+from src.control_types.model import ControlType  # noqa: F401
+from src.departments.model import Department  # noqa: F401
+from src.directions.model import Direction  # noqa: F401
+from src.disciplines.model import Discipline  # noqa: F401
+from src.educational_forms.model import EducationalForm  # noqa: F401
+from src.educational_levels.model import EducationalLevel  # noqa: F401
+from src.indicators.model import Indicator  # noqa: F401
+from .model import MapCore
+from .schemas import MapCorsGarbageCollection
+
+logger = logging.getLogger(__name__)
+
+GC_BATCH_SIZE = 500
+
+# ядро считается осиротевшим, если на него не ссылается ни одно направление
+is_orphaned = ~exists().where(DirectionMapCore.map_core_id == MapCore.id)
+
+
+def _collect_batch(session: Session, batch_size: int) -> tuple[int, dict[str, int]]:
+    """Delete one batch of orphaned map cores; return the number of locked candidates and deleted row counts."""
+    # ядра, которые сейчас сохраняются другими транзакциями, заблокированы ими и пропускаются
+    candidate_ids = list(session.execute(
+        select(MapCore.id).where(is_orphaned).order_by(MapCore.id).limit(batch_size).with_for_update(skip_locked=True)
+    ).scalars())
+    if not candidate_ids:
+        return 0, {}
+
+    # повторная проверка новым снимком: связь могла быть зафиксирована до того, как строки были заблокированы;
+    # после блокировки новых ссылок на эти ядра появиться не может
+    map_core_ids = list(session.execute(
+        select(MapCore.id).where(MapCore.id.in_(candidate_ids), is_orphaned)
+    ).scalars())
+    if not map_core_ids:
+        return len(candidate_ids), {}
+
+    blocks = select(DisciplineBlock.id).where(DisciplineBlock.map_core_id.in_(map_core_ids))
+    deleted = {
+        'discipline_block_competencies': session.execute(
+            delete(DisciplineBlockCompetency).where(DisciplineBlockCompetency.discipline_block_id.in_(blocks))
+        ).rowcount,
+        'discipline_block_activity_types': session.execute(
+            delete(DisciplineBlockActivityType).where(DisciplineBlockActivityType.discipline_block_id.in_(blocks))
+        ).rowcount,
+        'discipline_blocks': session.execute(
+            delete(DisciplineBlock).where(DisciplineBlock.map_core_id.in_(map_core_ids))
+        ).rowcount,
+        'map_cors': session.execute(delete(MapCore).where(MapCore.id.in_(map_core_ids))).rowcount,
+    }
+    return len(candidate_ids), deleted
+
+
+def collect_orphaned_map_cors(
+        session: Session, batch_size: int = GC_BATCH_SIZE, max_batches: int | None = None
+) -> MapCorsGarbageCollection:
+    """
+    Delete orphaned map cores with their discipline blocks and links in batches,
+    each batch in its own short transaction, so saves are blocked at most for one batch.
+    """
+    report = MapCorsGarbageCollection(
+        batches=0, map_cors=0, discipline_blocks=0, discipline_block_competencies=0, discipline_block_activity_types=0
+    )
+    while max_batches is None or report.batches < max_batches:
+        locked, deleted = _collect_batch(session, batch_size)
+        session.commit()
+        if not locked:
+            break
+
+        report.batches += 1
+        for key, count in deleted.items():
+            setattr(report, key, getattr(report, key) + count)
+        if locked < batch_size:
+            break
+
+    logger.info('Map cors garbage collection: %s', report.model_dump())
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m src.map_cors.gc')
+    parser.add_argument('--batch-size', type=int, default=GC_BATCH_SIZE)
+    parser.add_argument('--max-batches', type=int)
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        report = collect_orphaned_map_cors(session, args.batch_size, args.max_batches)
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == '__main__':
+    main()
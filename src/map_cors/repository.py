@@ -4,5 +4,5 @@ from .model import MapCore
 
 
 class MapCorsRepository(SQLAlchemyRepository):
-    def __init__(self, session: Session):
-        super().__init__(session, MapCore)
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, MapCore, autocommit)
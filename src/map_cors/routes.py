@@ -1,11 +1,14 @@
-from fastapi import APIRouter, status, Path
+from fastapi import APIRouter, status, Path, Query
 from fastapi.responses import Response
 from sqlalchemy import select
 from typing import Annotated, Any
+from src.core.writes import insert_returning, update_returning
 from src.dependencies import SessionDep
 from src.exceptions import MapCoreNotFoundException
+from src.maps.revisions import bump_map_cors_plan_versions
+from .gc import collect_orphaned_map_cors, GC_BATCH_SIZE
 from .model import MapCore
-from .schemas import MapCoreCreate, MapCoreUpdate, MapCoreRead
+from .schemas import MapCoreCreate, MapCoreUpdate, MapCoreRead, MapCorsGarbageCollection
 
 router = APIRouter(
     prefix='/map-cors',
@@ -13,6 +16,23 @@ router = APIRouter(
 )
 
 
+@router.post(
+    '/gc',
+    responses={200: {'description': 'Orphaned map cores successfully deleted'}},
+    summary='Delete map cores not linked to any direction'
+)
+def collect_map_cors_garbage(
+        session: SessionDep,
+        batch_size: Annotated[int, Query(gt=0, le=10000)] = GC_BATCH_SIZE,
+        max_batches: Annotated[int | None, Query(gt=0)] = None
+) -> MapCorsGarbageCollection:
+    """
+    Delete map cores that are not linked to any direction, together with their discipline blocks,
+    in batches of batch_size cores, each in its own transaction. Cores being saved concurrently are skipped.
+    """
+    return collect_orphaned_map_cors(session, batch_size, max_batches)
+
+
 @router.get(
     '/{map_core_id}',
     responses={
@@ -42,14 +62,12 @@ def update_map_core(
         session: SessionDep
 ) -> MapCoreRead:
     """Update the map core with the specified id with the given information (blank values are ignored)"""
-    map_core = session.get(MapCore, map_core_id)
-    if not map_core:
-        raise MapCoreNotFoundException()
-
-    for key, value in map_core_data.model_dump(exclude_none=True).items():
-        setattr(map_core, key, value)
+    map_core = update_returning(
+        session, MapCore, map_core_id, map_core_data.model_dump(exclude_none=True),
+        not_found=MapCoreNotFoundException
+    )
+    bump_map_cors_plan_versions(session, map_core_id)
     session.commit()
-    session.refresh(map_core)
     return map_core
 
 
@@ -67,6 +85,7 @@ def delete_map_core(map_core_id: Annotated[int, Path(gt=0)], session: SessionDep
     map_core = session.get(MapCore, map_core_id)
     if not map_core:
         raise MapCoreNotFoundException()
+    bump_map_cors_plan_versions(session, map_core_id)
     session.delete(map_core)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -94,8 +113,6 @@ def get_map_cores(session: SessionDep) -> list[MapCoreRead]:
 )
 def create_map_core(map_core_data: MapCoreCreate, session: SessionDep) -> Any:
     """Create the map core with the given information."""
-    map_core = MapCore(**map_core_data.model_dump())
-    session.add(map_core)
+    map_core = insert_returning(session, MapCore, map_core_data.model_dump())
     session.commit()
-    session.refresh(map_core)
     return map_core
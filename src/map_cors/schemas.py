@@ -14,3 +14,11 @@ class MapCoreUpdate(BaseModel):
 
 class MapCoreRead(MapCoreCreate):
     id: Annotated[int, Field(example=1)]
+
+
+class MapCorsGarbageCollection(BaseModel):
+    batches: Annotated[int, Field(example=2)]
+    map_cors: Annotated[int, Field(example=640)]
+    discipline_blocks: Annotated[int, Field(example=25600)]
+    discipline_block_competencies: Annotated[int, Field(example=76800)]
+    discipline_block_activity_types: Annotated[int, Field(example=0)]
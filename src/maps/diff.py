@@ -0,0 +1,74 @@
+from collections import Counter
+
+# поля блока, которые сравниваются у блоков с одинаковыми дисциплиной и семестром;
+# вид контроля сравнивается по идентификатору
+COMPARED_FIELDS = ('credit_units', 'control_type_id', 'lecture_hours', 'practice_hours', 'lab_hours')
+
+
+def _block_values(block: dict) -> tuple:
+    return (
+        block['credit_units'], block['control_type'] and block['control_type']['id'],
+        block['lecture_hours'], block['practice_hours'], block['lab_hours']
+    )
+
+
+def _index_blocks(map_cors: list[dict]) -> dict[tuple[int, int, int], dict]:
+    """
+    Index the blocks of the plan by (discipline id, semester, occurrence); the occurrence number
+    distinguishes blocks of the same discipline in the same semester (e.g. in different map cores).
+    """
+    occurrences = Counter()
+    blocks = {}
+    for map_core in map_cors:
+        for block in map_core['discipline_blocks']:
+            key = (block['discipline']['id'], block['semester_number'])
+            blocks[(*key, occurrences[key])] = block
+            occurrences[key] += 1
+    return blocks
+
+
+def diff_plans(left_map_cors: list[dict], right_map_cors: list[dict]) -> dict:
+    """
+    Compare two plans given as unload data (MapUnload.map_cors dicts) and return MapDiff data
+    without direction ids. Blocks are matched by discipline and semester in linear time.
+    """
+    left_blocks = _index_blocks(left_map_cors)
+    right_blocks = _index_blocks(right_map_cors)
+
+    added = [block for key, block in right_blocks.items() if key not in left_blocks]
+    removed = [block for key, block in left_blocks.items() if key not in right_blocks]
+    changed = []
+    unchanged_count = 0
+    for key, left in left_blocks.items():
+        right = right_blocks.get(key)
+        if right is None:
+            continue
+
+        left_values, right_values = _block_values(left), _block_values(right)
+        left_competencies = {competency['id']: competency for competency in left['competencies']}
+        right_competencies = {competency['id']: competency for competency in right['competencies']}
+        if left_values == right_values and left_competencies.keys() == right_competencies.keys():
+            unchanged_count += 1
+            continue
+
+        changed.append({
+            'discipline': right['discipline'],
+            'semester_number': right['semester_number'],
+            'left_id': left['id'],
+            'right_id': right['id'],
+            'changes': [
+                {'field': field, 'left': left_value, 'right': right_value}
+                for field, left_value, right_value in zip(COMPARED_FIELDS, left_values, right_values)
+                if left_value != right_value
+            ],
+            'added_competencies': [
+                competency for competency_id, competency in right_competencies.items()
+                if competency_id not in left_competencies
+            ],
+            'removed_competencies': [
+                competency for competency_id, competency in left_competencies.items()
+                if competency_id not in right_competencies
+            ]
+        })
+
+    return {'added': added, 'removed': removed, 'changed': changed, 'unchanged_count': unchanged_count}
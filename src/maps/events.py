@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+import orjson
+from sqlalchemy import Engine
+from starlette.concurrency import run_in_threadpool
+from src.database import SessionLocal
+from .revisions import PLAN_CHANGED_CHANNEL, get_plan_version, get_plan_versions
+
+logger = logging.getLogger(__name__)
+
+# пауза между попытками восстановить соединение LISTEN (с)
+LISTEN_RECONNECT_DELAY = float(os.getenv('PLAN_EVENTS_RECONNECT_DELAY', '5'))
+# интервал комментариев-пингов, чтобы прокси не закрывали простаивающий поток (с)
+SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', '15'))
+
+
+class PlanEventsBroker:
+    """
+    In-process fan-out of plan version changes to the subscribers of a direction.
+    Only the latest version matters to a subscriber, so a slow one gets it instead of a backlog.
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+
+    @contextmanager
+    def subscribe(self, direction_id: int) -> Iterator[asyncio.Queue]:
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers[direction_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[direction_id].discard(queue)
+            if not self._subscribers[direction_id]:
+                del self._subscribers[direction_id]
+
+    def direction_ids(self) -> list[int]:
+        """Return the directions that have subscribers."""
+        return list(self._subscribers)
+
+    def publish(self, direction_id: int, plan_version: int) -> None:
+        for queue in self._subscribers.get(direction_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(plan_version)
+
+
+plan_events = PlanEventsBroker()
+
+
+def _parse_notification(payload: str) -> tuple[int, int] | None:
+    direction_id, _, plan_version = payload.partition(':')
+    try:
+        return int(direction_id), int(plan_version)
+    except ValueError:
+        logger.warning('Malformed %s notification: %r', PLAN_CHANGED_CHANNEL, payload)
+        return None
+
+
+def _connect_listener(engine: Engine):
+    """Open a DBAPI connection outside the pool and LISTEN to plan change notifications on it."""
+    connect_args, connect_kwargs = engine.dialect.create_connect_args(engine.url)
+    connection = engine.dialect.connect(*connect_args, **connect_kwargs)
+    try:
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {PLAN_CHANGED_CHANNEL}')
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+
+def _current_plan_versions(direction_ids: list[int]) -> dict[int, int]:
+    with SessionLocal() as session:
+        return get_plan_versions(session, direction_ids)
+
+
+async def listen_plan_changes(engine: Engine, broker: PlanEventsBroker = plan_events) -> None:
+    """
+    LISTEN to plan change notifications of all workers on a dedicated connection outside the pool
+    and publish them to the local broker; the connection is restored after failures until cancelled.
+    Connecting and reading from the database run in the thread pool, only reading notifications
+    from the established connection happens in the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        connection = fd = None
+        readable = asyncio.Event()
+        try:
+            connection = await run_in_threadpool(_connect_listener, engine)
+            fd = connection.fileno()
+            loop.add_reader(fd, readable.set)
+            logger.info('Listening to %s notifications', PLAN_CHANGED_CHANNEL)
+            # уведомления, отправленные пока соединения не было, потеряны: подписчики получают текущие версии,
+            # прочитанные уже после LISTEN, так что ни одно последующее изменение не пропадает
+            plan_versions = await run_in_threadpool(_current_plan_versions, broker.direction_ids())
+            for direction_id, plan_version in plan_versions.items():
+                broker.publish(direction_id, plan_version)
+            while True:
+                await readable.wait()
+                readable.clear()
+                connection.poll()
+                while connection.notifies:
+                    event = _parse_notification(connection.notifies.pop(0).payload)
+                    if event is not None:
+                        broker.publish(*event)
+        except Exception:  # слушатель не должен останавливаться до завершения приложения
+            logger.exception('Plan change notifications connection failed, reconnecting')
+            await asyncio.sleep(LISTEN_RECONNECT_DELAY)
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+            if connection is not None:
+                connection.close()
+
+
+def _sse_event(direction_id: int, plan_version: int) -> bytes:
+    data = orjson.dumps({'direction_id': direction_id, 'plan_version': plan_version})
+    return b'event: plan_changed\nid: %d\ndata: %s\n\n' % (plan_version, data)
+
+
+def _current_plan_version(direction_id: int) -> int | None:
+    with SessionLocal() as session:
+        return get_plan_version(session, direction_id)
+
+
+async def stream_plan_events(direction_id: int, broker: PlanEventsBroker = plan_events) -> AsyncIterator[bytes]:
+    """
+    Yield server-sent events for the direction: the current plan version first, then every new one.
+    The current version is read after subscribing, so no change made in between is missed.
+    """
+    with broker.subscribe(direction_id) as queue:
+        plan_version = await run_in_threadpool(_current_plan_version, direction_id)
+        if plan_version is None:
+            return
+        yield _sse_event(direction_id, plan_version)
+
+        while True:
+            try:
+                new_version = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b': ping\n\n'
+                continue
+            # уведомление о версии, уже прочитанной при подписке, приходит позже и пропускается
+            if new_version > plan_version:
+                plan_version = new_version
+                yield _sse_event(direction_id, plan_version)
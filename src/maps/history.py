@@ -0,0 +1,236 @@
+import gzip
+import os
+from collections.abc import Iterable
+import orjson
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from src.control_types.model import ControlType
+from src.departments.model import Department
+from src.direction_map_cors.model import DirectionMapCore
+from src.discipline_block_competencies.model import DisciplineBlockCompetency
+from src.discipline_blocks.model import DisciplineBlock
+from src.disciplines.model import Discipline
+from src.map_cors.model import MapCore
+from .model import PlanVersion
+from .snapshots import COMPRESS_LEVEL
+
+# полное состояние плана сохраняется не реже, чем через столько версий,
+# поэтому для восстановления любой версии применяется не больше PLAN_HISTORY_SNAPSHOT_INTERVAL - 1 разниц
+PLAN_HISTORY_SNAPSHOT_INTERVAL = int(os.getenv('PLAN_HISTORY_SNAPSHOT_INTERVAL', '10'))
+
+
+def plan_state(map_cors: list[dict]) -> dict:
+    """Convert unload data (MapUnload.map_cors dicts) into the plan state in the MapLoad format without ids."""
+    return {'map_cors': [
+        {
+            'name': map_core['name'],
+            'semesters_count': map_core['semesters_count'],
+            'discipline_blocks': [
+                {
+                    'discipline_id': block['discipline']['id'],
+                    'credit_units': block['credit_units'],
+                    'control_type_id': block['control_type'] and block['control_type']['id'],
+                    'lecture_hours': block['lecture_hours'],
+                    'practice_hours': block['practice_hours'],
+                    'lab_hours': block['lab_hours'],
+                    'semester_number': block['semester_number'],
+                    'competencies': [{'id': competency['id']} for competency in block['competencies']]
+                }
+                for block in map_core['discipline_blocks']
+            ]
+        }
+        for map_core in map_cors
+    ]}
+
+
+def read_plan_state(session: Session, direction_id: int) -> dict:
+    """
+    Read the current plan state of the direction from the plan tables in two queries;
+    the result equals plan_state of the direction's unload.
+    """
+    map_cors_stmt = (
+        select(DirectionMapCore.map_core_id, MapCore.name, MapCore.semesters_count)
+        .join(MapCore, MapCore.id == DirectionMapCore.map_core_id)
+        .where(DirectionMapCore.direction_id == direction_id)
+        .order_by(DirectionMapCore.id)
+    )
+    map_cors = session.execute(map_cors_stmt).all()
+
+    competency_ids = (
+        select(func.array_agg(
+            aggregate_order_by(DisciplineBlockCompetency.competency_id, DisciplineBlockCompetency.id)
+        ))
+        .where(DisciplineBlockCompetency.discipline_block_id == DisciplineBlock.id)
+        .correlate(DisciplineBlock)
+        .scalar_subquery()
+    )
+    # соединения те же, что в выгрузке плана, чтобы состояние совпадало с записанным при сохранении
+    blocks_stmt = (
+        select(
+            DisciplineBlock.map_core_id, DisciplineBlock.discipline_id, DisciplineBlock.credit_units,
+            DisciplineBlock.control_type_id, DisciplineBlock.lecture_hours, DisciplineBlock.practice_hours,
+            DisciplineBlock.lab_hours, DisciplineBlock.semester_number, competency_ids.label('competency_ids')
+        )
+        .join(Discipline, Discipline.id == DisciplineBlock.discipline_id)
+        .join(Department, Department.id == Discipline.department_id)
+        .join(ControlType, ControlType.id == DisciplineBlock.control_type_id)
+        .where(DisciplineBlock.map_core_id.in_({map_core.map_core_id for map_core in map_cors}))
+        .order_by(DisciplineBlock.id)
+    )
+    discipline_blocks = {map_core.map_core_id: [] for map_core in map_cors}
+    for row in session.execute(blocks_stmt):
+        discipline_blocks[row.map_core_id].append({
+            'discipline_id': row.discipline_id,
+            'credit_units': row.credit_units,
+            'control_type_id': row.control_type_id,
+            'lecture_hours': row.lecture_hours,
+            'practice_hours': row.practice_hours,
+            'lab_hours': row.lab_hours,
+            'semester_number': row.semester_number,
+            'competencies': [{'id': competency_id} for competency_id in row.competency_ids or ()]
+        })
+
+    return {'map_cors': [
+        {
+            'name': map_core.name,
+            'semesters_count': map_core.semesters_count,
+            'discipline_blocks': discipline_blocks[map_core.map_core_id]
+        }
+        for map_core in map_cors
+    ]}
+
+
+def make_delta(base: dict, state: dict) -> dict:
+    """
+    Return the delta turning the base plan state into the given one: every map core refers to the base core
+    at the same position, its blocks equal to blocks of that core are replaced with their positions there.
+    """
+    base_map_cors = base['map_cors']
+    map_cors = []
+    for index, map_core in enumerate(state['map_cors']):
+        base_blocks = {}
+        if index < len(base_map_cors):
+            for block_index, block in enumerate(base_map_cors[index]['discipline_blocks']):
+                base_blocks.setdefault(orjson.dumps(block), block_index)
+        map_cors.append({
+            'name': map_core['name'],
+            'semesters_count': map_core['semesters_count'],
+            'discipline_blocks': [
+                base_blocks.get(orjson.dumps(block), block) for block in map_core['discipline_blocks']
+            ]
+        })
+    return {'map_cors': map_cors}
+
+
+def apply_delta(base: dict, delta: dict) -> dict:
+    """Return the plan state produced by applying the delta made by make_delta to the base state."""
+    base_map_cors = base['map_cors']
+    return {'map_cors': [
+        {
+            'name': map_core['name'],
+            'semesters_count': map_core['semesters_count'],
+            'discipline_blocks': [
+                base_map_cors[index]['discipline_blocks'][block] if isinstance(block, int) else block
+                for block in map_core['discipline_blocks']
+            ]
+        }
+        for index, map_core in enumerate(delta['map_cors'])
+    ]}
+
+
+def _get_chain(session: Session, direction_id: int, plan_version: int) -> list[Row]:
+    """Return the records from the nearest full state up to the given version inclusive, oldest first."""
+    snapshot_version = (
+        select(func.max(PlanVersion.plan_version))
+        .where(
+            PlanVersion.direction_id == direction_id,
+            PlanVersion.plan_version <= plan_version,
+            PlanVersion.chain_length == 0
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        select(PlanVersion.plan_version, PlanVersion.chain_length, PlanVersion.content)
+        .where(
+            PlanVersion.direction_id == direction_id,
+            PlanVersion.plan_version >= snapshot_version,
+            PlanVersion.plan_version <= plan_version
+        )
+        .order_by(PlanVersion.plan_version)
+    )
+    return list(session.execute(stmt))
+
+
+def get_plan_state(session: Session, direction_id: int, plan_version: int) -> dict | None:
+    """Reconstruct the plan state of the version in one query; None if the version is not recorded."""
+    chain = _get_chain(session, direction_id, plan_version)
+    if not chain or chain[-1].plan_version != plan_version:
+        return None
+
+    state = orjson.loads(gzip.decompress(chain[0].content))
+    for record in chain[1:]:
+        state = apply_delta(state, orjson.loads(gzip.decompress(record.content)))
+    return state
+
+
+def get_latest_recorded_version(session: Session, direction_id: int) -> Row | None:
+    """Return (plan_version, chain_length) of the latest recorded version of the direction."""
+    stmt = (
+        select(PlanVersion.plan_version, PlanVersion.chain_length)
+        .where(PlanVersion.direction_id == direction_id)
+        .order_by(PlanVersion.plan_version.desc())
+        .limit(1)
+    )
+    return session.execute(stmt).one_or_none()
+
+
+def record_plan_version(session: Session, direction_id: int, plan_version: int, state: dict) -> None:
+    """
+    Append the plan state of the version to the history within the current transaction:
+    as a delta from the latest recorded version or, every PLAN_HISTORY_SNAPSHOT_INTERVAL versions, in full.
+    """
+    latest = get_latest_recorded_version(session, direction_id)
+    if latest is not None and latest.plan_version >= plan_version:
+        return
+
+    if latest is None or latest.chain_length + 1 >= PLAN_HISTORY_SNAPSHOT_INTERVAL:
+        chain_length, content = 0, state
+    else:
+        chain_length = latest.chain_length + 1
+        content = make_delta(get_plan_state(session, direction_id, latest.plan_version), state)
+
+    stmt = insert(PlanVersion).values(
+        direction_id=direction_id,
+        plan_version=plan_version,
+        chain_length=chain_length,
+        content=gzip.compress(orjson.dumps(content), compresslevel=COMPRESS_LEVEL, mtime=0)
+    )
+    # версия могла быть записана параллельной транзакцией
+    session.execute(stmt.on_conflict_do_nothing(index_elements=[PlanVersion.direction_id, PlanVersion.plan_version]))
+
+
+def record_edited_plan_versions(session: Session, plan_versions: Iterable[tuple[int, int]]) -> None:
+    """
+    Append the (direction_id, plan_version) versions made by editing single map cores, discipline blocks
+    or their links to the history within the current transaction; the edits are flushed first.
+    """
+    session.flush()
+    for direction_id, plan_version in plan_versions:
+        record_plan_version(session, direction_id, plan_version, read_plan_state(session, direction_id))
+
+
+def list_plan_versions(session: Session, direction_id: int) -> list[Row]:
+    """Return the recorded versions of the direction's plan without their content, newest first."""
+    stmt = (
+        select(
+            PlanVersion.plan_version,
+            (PlanVersion.chain_length == 0).label('full'),
+            func.length(PlanVersion.content).label('size'),
+            PlanVersion.created_at
+        )
+        .where(PlanVersion.direction_id == direction_id)
+        .order_by(PlanVersion.plan_version.desc())
+    )
+    return list(session.execute(stmt))
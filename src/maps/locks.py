@@ -0,0 +1,39 @@
+import os
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from src.exceptions import MapSaveLockTimeoutException
+from .revisions import get_plan_version
+
+# сколько сохранение плана ждет, пока другое сохранение того же направления завершится
+PLAN_LOCK_TIMEOUT_MS = int(os.getenv('PLAN_LOCK_TIMEOUT_MS', '5000'))
+
+# первая половина ключа advisory-блокировки, чтобы ключи направлений не пересекались с другими блокировками
+PLAN_LOCK_NAMESPACE = 1
+
+
+def lock_direction_plan(
+        session: Session, direction_id: int, timeout_ms: int = PLAN_LOCK_TIMEOUT_MS
+) -> int | None:
+    """
+    Take the transaction-level advisory lock of the direction's plan: saves of the same direction are serialized,
+    other directions and readers are not blocked. The lock is released on commit or rollback.
+    Return the plan version read with the direction row locked (None if the direction does not exist).
+    The timeout stays in effect for the rest of the transaction, bounding the waits for row locks too.
+    """
+    session.execute(text("SELECT set_config('lock_timeout', :timeout, true)"), {'timeout': f'{timeout_ms}ms'})
+    try:
+        session.execute(
+            text('SELECT pg_advisory_xact_lock(:namespace, :direction_id)'),
+            {'namespace': PLAN_LOCK_NAMESPACE, 'direction_id': direction_id}
+        )
+        # правки блоков и ядер не берут advisory-блокировку, но увеличивают версию плана UPDATE-ом строки
+        # направления: блокировка строки дожидается их фиксации, и проверка версии видит их изменения,
+        # а правки, начатые позже, ждут окончания сохранения
+        return get_plan_version(session, direction_id, for_update=True)
+    except OperationalError as e:
+        # 55P03 lock_not_available - истек lock_timeout
+        if getattr(e.orig, 'pgcode', None) != '55P03':
+            raise
+        session.rollback()
+        raise MapSaveLockTimeoutException() from e
@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import Integer, LargeBinary, ForeignKey, DateTime, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.base_model import Base
+
+
+class PlanSnapshot(Base):
+    """Скомпилированные карты направлений (сжатый gzip JSON выгрузки) для чтения одной строкой."""
+    __tablename__ = 'plan_snapshots'
+
+    direction_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('directions.id', ondelete='CASCADE'), primary_key=True
+    )
+    plan_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class PlanVersion(Base):
+    """
+    История планов направлений: на каждую сохраненную версию плана - разница с предыдущей версией
+    или, периодически, полное состояние плана (сжатый gzip JSON в формате загрузки).
+    """
+    __tablename__ = 'plan_versions'
+    __table_args__ = (
+        UniqueConstraint('direction_id', 'plan_version'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    direction_id: Mapped[int] = mapped_column(Integer, ForeignKey('directions.id', ondelete='CASCADE'))
+    plan_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    # количество разниц от ближайшего полного состояния, 0 - запись сама хранит полное состояние
+    chain_length: Mapped[int] = mapped_column(Integer, nullable=False)
+    content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,50 @@
+"""
+Rebuild plan snapshots, e.g. after reference data embedded into them was changed directly in the database.
+
+    python -m src.maps.rebuild_snapshots            # all directions
+    python -m src.maps.rebuild_snapshots 3 7        # only the given directions
+"""
+import argparse
+from sqlalchemy import select
+from src.database import SessionLocal
+from src.directions.model import Direction
+# модели, на которые ссылаются relationship() остальных моделей
+from src.competency_groups.model import CompetencyGroup  # noqa: F401
+from src.indicators.model import Indicator  # noqa: F401
+from src.directions.repository import DirectionsRepository
+from src.map_cors.repository import MapCorsRepository
+from src.direction_map_cors.repository import DirectionMapCorsRepository
+from src.discipline_blocks.repository import DisciplineBlocksRepository
+from src.discipline_block_competencies.repository import DisciplineBlockCompetenciesRepository
+from src.disciplines.repository import DisciplinesRepository
+from src.departments.repository import DepartmentsRepository
+from src.control_types.repository import ControlTypesRepository
+from src.competencies.repository import CompetenciesRepository
+from .service import MapsService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m src.maps.rebuild_snapshots')
+    parser.add_argument('direction_ids', nargs='*', type=int, help='directions to rebuild (all by default)')
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        maps_service = MapsService(*(
+            repository(session, autocommit=False) for repository in (
+                DirectionsRepository, MapCorsRepository, DirectionMapCorsRepository, DisciplineBlocksRepository,
+                DisciplineBlockCompetenciesRepository, DisciplinesRepository, DepartmentsRepository,
+                ControlTypesRepository, CompetenciesRepository
+            )
+        ))
+        direction_ids = args.direction_ids or list(
+            session.execute(select(Direction.id).order_by(Direction.id)).scalars()
+        )
+        rebuilt = 0
+        for direction_id in direction_ids:
+            maps_service.rebuild_plan_snapshot(direction_id)
+            rebuilt += 1
+    print(f'Rebuilt {rebuilt} plan snapshots')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+from src.directions.model import Direction
+from src.direction_map_cors.model import DirectionMapCore
+from src.discipline_blocks.model import DisciplineBlock
+from src.table_revisions.revisions import table_revision, bump_table_revision
+from .history import record_edited_plan_versions
+
+# канал PostgreSQL, в который при смене версии плана уходит '<direction_id>:<plan_version>'
+PLAN_CHANGED_CHANNEL = 'plan_changed'
+# счетчик в table_revisions, увеличивающийся при изменении версии любого плана
+PLANS_REVISION = 'plans'
+
+
+def _bump_and_notify(session: Session, directions_filter):
+    """
+    Increment the plan versions of the matching directions and queue a notification for each of them.
+    NOTIFY is transactional: listeners receive it only when (and if) the transaction commits.
+    """
+    bump_table_revision(session, PLANS_REVISION)
+    bumped = (
+        update(Direction)
+        .where(directions_filter)
+        .values(plan_version=Direction.plan_version + 1)
+        .returning(Direction.id, Direction.plan_version)
+        .cte('bumped')
+    )
+    payload = func.concat_ws(':', bumped.c.id, bumped.c.plan_version)
+    stmt = select(bumped.c.plan_version, bumped.c.id, func.pg_notify(PLAN_CHANGED_CHANNEL, payload))
+    return session.execute(stmt)
+
+
+def get_plan_version(session: Session, direction_id: int, for_update: bool = False) -> int | None:
+    """
+    Return the plan version of the direction or None if the direction does not exist;
+    with for_update the direction row stays locked until the end of the transaction.
+    """
+    stmt = select(Direction.plan_version).where(Direction.id == direction_id)
+    if for_update:
+        stmt = stmt.with_for_update()
+    return session.execute(stmt).scalar()
+
+
+def get_plan_revision(session: Session, direction_id: int, *models: type) -> tuple[int, ...] | None:
+    """
+    Return the plan version of the direction followed by the revisions of the models' tables, read in one query,
+    or None if the direction does not exist; meant as a cache revision of data built from the plan and the tables.
+    """
+    stmt = select(Direction.plan_version, *(table_revision(model) for model in models)).where(
+        Direction.id == direction_id
+    )
+    row = session.execute(stmt).first()
+    return tuple(row) if row is not None else None
+
+
+def get_plan_versions(session: Session, direction_ids: list[int]) -> dict[int, int]:
+    """Return the plan versions of the existing directions among the given ones by direction id."""
+    if not direction_ids:
+        return {}
+    stmt = select(Direction.id, Direction.plan_version).where(Direction.id.in_(direction_ids))
+    return dict(session.execute(stmt).tuples().all())
+
+
+def global_plan_revision():
+    """Return a scalar subquery with the revision of all plans: it changes whenever any plan version changes."""
+    return table_revision(PLANS_REVISION)
+
+
+def bump_plan_version(session: Session, direction_id: int) -> int | None:
+    """
+    Increment the plan version of the direction within the current transaction;
+    the caller appends the new version to the plan history, as load_map and clone_map do.
+    """
+    return _bump_and_notify(session, Direction.id == direction_id).scalar()
+
+
+def _bump_edited(session: Session, directions_filter) -> None:
+    bumped = _bump_and_notify(session, directions_filter).all()
+    record_edited_plan_versions(session, [(direction_id, plan_version) for plan_version, direction_id, _ in bumped])
+
+
+def bump_edited_plan_versions(session: Session, *direction_ids: int) -> None:
+    """
+    Increment the plan versions of the directions whose maps were edited within the current transaction
+    and append the new versions to the plan history.
+    """
+    _bump_edited(session, Direction.id.in_(set(direction_ids)))
+
+
+def bump_map_cors_plan_versions(session: Session, *map_core_ids: int | None) -> None:
+    """
+    Increment the plan versions of all directions that include any of the given map cores
+    and append the new versions to the plan history.
+    """
+    map_core_ids = [map_core_id for map_core_id in map_core_ids if map_core_id]
+    if not map_core_ids:
+        return
+
+    direction_ids = select(DirectionMapCore.direction_id).where(DirectionMapCore.map_core_id.in_(map_core_ids))
+    _bump_edited(session, Direction.id.in_(direction_ids))
+
+
+def bump_discipline_blocks_plan_versions(session: Session, *discipline_block_ids: int | None) -> None:
+    """
+    Increment the plan versions of all directions that include any of the given discipline blocks
+    and append the new versions to the plan history.
+    """
+    discipline_block_ids = [discipline_block_id for discipline_block_id in discipline_block_ids if discipline_block_id]
+    if not discipline_block_ids:
+        return
+
+    map_core_ids = session.execute(
+        select(DisciplineBlock.map_core_id).where(DisciplineBlock.id.in_(discipline_block_ids))
+    ).scalars()
+    bump_map_cors_plan_versions(session, *map_core_ids)
@@ -1,18 +1,20 @@
 # from fastapi import APIRouter, status, Path, Response
 # from typing import Annotated
 # from src.dependencies import MapsServiceDep
-# from .schemas import MapLoad, MapUnload, MapCoreUnload
-from openpyxl.styles import PatternFill
-
-from fastapi import APIRouter, status, Path, Response
+# from .schemas import MapLoad, MapUnload, MapCoreUnload, MapClone
+from fastapi import APIRouter, Depends, status, Path, Query, Request, Response
 from typing import Annotated
 from fastapi.responses import StreamingResponse  # <‑‑ добавили
-from io import StringIO, BytesIO
-import csv
-from openpyxl import Workbook
+from io import BytesIO
 
+from src.core.compression import gzip_content_response
+from src.core.negotiation import (
+    accepts_msgpack, msgpack_response, negotiated_body, negotiated_body_openapi, MSGPACK_MEDIA_TYPE
+)
 from src.dependencies import MapsServiceDep
-from .schemas import MapLoad, MapUnload, MapCoreUnload
+from .schemas import MapLoad, MapUnload, MapCoreUnload, MapClone, MapDiff, MapVersionRead
+from .streaming import NDJSON_MEDIA_TYPE
+from .events import stream_plan_events
 
 
 router = APIRouter(
@@ -27,23 +29,155 @@ router = APIRouter(
         204: {'description': 'Educational map successfully loaded'},
         404: {'description': 'Direction not found'}
     },
+    openapi_extra=negotiated_body_openapi('MapLoad'),
     summary='Load the educational map into the database'
 )
-def load_map(direction_id: Annotated[int, Path(gt=0)], data: MapLoad, maps_service: MapsServiceDep) -> Response:
+def load_map(
+        direction_id: Annotated[int, Path(gt=0)],
+        data: Annotated[MapLoad, Depends(negotiated_body(MapLoad))],
+        maps_service: MapsServiceDep
+) -> Response:
+    """Load the map given as JSON or, with Content-Type: application/msgpack, as MessagePack"""
     maps_service.load_map(direction_id, data)
     return {'success': 'ok'}
 
 
+@router.post(
+    '/directions/{direction_id}/maps/clone-from/{source_direction_id}',
+    responses={
+        200: {'description': 'Educational map successfully cloned'},
+        404: {'description': 'Direction not found'},
+        409: {'description': 'Source and target directions are the same'}
+    },
+    summary='Replace the educational map of the direction with a copy of another direction\'s map'
+)
+def clone_map(
+        direction_id: Annotated[int, Path(gt=0)],
+        source_direction_id: Annotated[int, Path(gt=0)],
+        maps_service: MapsServiceDep
+) -> MapClone:
+    return maps_service.clone_map(direction_id, source_direction_id)
+
+
+@router.get(
+    '/directions/{direction_id}/maps/versions',
+    responses={
+        200: {'description': 'Educational map versions successfully received'},
+        404: {'description': 'Direction not found'}
+    },
+    summary='Return the recorded versions of the educational map'
+)
+def list_map_versions(direction_id: Annotated[int, Path(gt=0)], maps_service: MapsServiceDep) -> list[MapVersionRead]:
+    """Return the versions of the direction's plan kept in its history, newest first."""
+    return maps_service.list_map_versions(direction_id)
+
+
+@router.get(
+    '/directions/{direction_id}/maps/versions/{plan_version}',
+    responses={
+        200: {'description': 'Educational map version successfully received'},
+        404: {'description': 'Direction or version not found'}
+    },
+    response_model=MapLoad,
+    summary='Return the educational map as of the version'
+)
+def get_map_version(
+        direction_id: Annotated[int, Path(gt=0)],
+        plan_version: Annotated[int, Path(gt=0)],
+        maps_service: MapsServiceDep
+) -> Response:
+    """
+    Return the direction's plan as it was in the given version, in the load format:
+    loading it back with maps/load rolls the plan back to that version.
+    """
+    return Response(content=maps_service.get_map_version_json(direction_id, plan_version), media_type='application/json')
+
+
+@router.get(
+    '/maps/diff',
+    responses={
+        200: {'description': 'Educational maps successfully compared'},
+        404: {'description': 'Direction not found'}
+    },
+    response_model=MapDiff,
+    summary='Compare the educational maps of two directions'
+)
+def diff_maps(
+        left: Annotated[int, Query(gt=0)], right: Annotated[int, Query(gt=0)], maps_service: MapsServiceDep
+) -> Response:
+    """
+    Return discipline blocks added to and removed from the right plan compared to the left one
+    and blocks of the same discipline and semester with changed hours, credit units, control type or competencies
+    """
+    return Response(content=maps_service.diff_maps_json(left, right), media_type='application/json')
+
+
 @router.get(
     '/directions/{direction_id}/maps/unload',
     responses={
-        200: {'description': 'Educational map successfully unloaded'},
+        200: {
+            'description': 'Educational map successfully unloaded',
+            'content': {MSGPACK_MEDIA_TYPE: {'schema': {'$ref': '#/components/schemas/MapUnload'}}}
+        },
         404: {'description': 'Direction not found'}
     },
+    response_model=MapUnload,
     summary='Unload the educational map from the database'
 )
-def unload_map(direction_id: Annotated[int, Path(gt=0)], maps_service: MapsServiceDep) -> MapUnload:
-    return maps_service.unload_map(direction_id)
+def unload_map(direction_id: Annotated[int, Path(gt=0)], request: Request, maps_service: MapsServiceDep) -> Response:
+    """Unload the map as JSON or, with Accept: application/msgpack, as MessagePack"""
+    if accepts_msgpack(request):
+        return msgpack_response(maps_service.unload_map_data(direction_id))
+
+    # данные берутся из собственной БД, поэтому отдаем готовый JSON без повторной валидации по MapUnload;
+    # снимок плана хранится в gzip и отдается клиенту без повторного сжатия
+    response = gzip_content_response(request, maps_service.unload_map_gzip(direction_id))
+    response.headers.add_vary_header('Accept')
+    return response
+
+
+@router.get(
+    '/directions/{direction_id}/maps/unload/stream',
+    responses={
+        200: {
+            'description': 'Educational map streamed as NDJSON, one MapCoreUnload per line; if the map is saved '
+                           'during the stream, it ends with a line {"detail": ..., "plan_version": ...}',
+            'content': {NDJSON_MEDIA_TYPE: {'schema': {'$ref': '#/components/schemas/MapCoreUnload'}}}
+        },
+        404: {'description': 'Direction not found'}
+    },
+    response_class=StreamingResponse,
+    summary='Stream the educational map from the database'
+)
+def stream_map(direction_id: Annotated[int, Path(gt=0)], maps_service: MapsServiceDep) -> StreamingResponse:
+    """Stream the map core by core, so the client can render it before the whole map is read"""
+    return StreamingResponse(maps_service.stream_map(direction_id), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get(
+    '/directions/{direction_id}/maps/events',
+    responses={
+        200: {
+            'description': 'Stream of plan change events',
+            'content': {'text/event-stream': {'example': 'event: plan_changed\nid: 13\n'
+                                                         'data: {"direction_id":1,"plan_version":13}\n\n'}}
+        },
+        404: {'description': 'Direction not found'}
+    },
+    response_class=StreamingResponse,
+    summary='Subscribe to changes of the educational map'
+)
+def map_events(direction_id: Annotated[int, Path(gt=0)], maps_service: MapsServiceDep) -> StreamingResponse:
+    """
+    Server-sent events: the current plan version right away and a plan_changed event with the new version
+    after every committed change of the plan, so open editors do not have to poll the unload
+    """
+    maps_service.get_map_version(direction_id)
+    return StreamingResponse(
+        stream_plan_events(direction_id),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @router.get(
     '/directions/{direction_id}/maps/export/excel',
@@ -58,6 +192,8 @@ def export_map_excel(direction_id: Annotated[int, Path(gt=0)],
     # 1. Get the same data as for JSON unload
     map_data: MapUnload = maps_service.unload_map(direction_id)
 
+    # openpyxl нужен только экспорту, поэтому не импортируется при старте приложения
+    from openpyxl import Workbook
 
     # 2. Create Excel workbook in memory
     wb = Workbook()
@@ -184,6 +320,8 @@ def export_map_excel(direction_id: Annotated[int, Path(gt=0)],
     # 1. Get the same data as for JSON unload
     map_data: MapUnload = maps_service.unload_map(direction_id)
 
+    from openpyxl import Workbook
+
     # 2. Create Excel workbook in memory
     wb = Workbook()
     ws = wb.active
@@ -233,7 +371,8 @@ def export_map_excel(direction_id: Annotated[int, Path(gt=0)],
         200: {'description': 'Map core successfully unloaded'},
         404: {'description': 'Map core not found'}
     },
+    response_model=MapCoreUnload,
     summary='Unload the map core from the database'
 )
-def unload_map_core(map_core_id: Annotated[int, Path(gt=0)], maps_service: MapsServiceDep) -> MapCoreUnload:
-    return maps_service.unload_map_core(map_core_id)
+def unload_map_core(map_core_id: Annotated[int, Path(gt=0)], maps_service: MapsServiceDep) -> Response:
+    return Response(content=maps_service.unload_map_core_json(map_core_id), media_type='application/json')
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Annotated
 
@@ -27,6 +28,10 @@ class MapCoreLoad(BaseModel):
 class MapLoad(BaseModel):
     direction_id: Annotated[int, Field(gt=0)]
     map_cors: list[MapCoreLoad]
+    version: Annotated[int | None, Field(
+        ge=0, default=None, example=12,
+        description='Plan version the map was based on; the load is rejected if the plan has changed since'
+    )]
 
 
 class CompetencyUnload(BaseModel):
@@ -82,3 +87,44 @@ class MapCoreUnload(BaseModel):
 
 class MapUnload(BaseModel):
     map_cors: list[MapCoreUnload]
+
+
+class MapClone(BaseModel):
+    direction_id: Annotated[int, Field(example=2)]
+    source_direction_id: Annotated[int, Field(example=1)]
+    plan_version: Annotated[int, Field(example=1)]
+    map_cors: Annotated[int, Field(example=3)]
+    discipline_blocks: Annotated[int, Field(example=120)]
+    discipline_block_competencies: Annotated[int, Field(example=360)]
+
+
+class MapDiffFieldChange(BaseModel):
+    field: Annotated[str, Field(example='lecture_hours')]
+    left: Annotated[int | None, Field(example=32)]
+    right: Annotated[int | None, Field(example=48)]
+
+
+class MapDiffChangedBlock(BaseModel):
+    discipline: DisciplineUnload
+    semester_number: Annotated[int, Field(example=3)]
+    left_id: Annotated[int, Field(example=1)]
+    right_id: Annotated[int, Field(example=41)]
+    changes: list[MapDiffFieldChange]
+    added_competencies: list[CompetencyUnload]
+    removed_competencies: list[CompetencyUnload]
+
+
+class MapDiff(BaseModel):
+    left_direction_id: Annotated[int, Field(example=1)]
+    right_direction_id: Annotated[int, Field(example=2)]
+    added: list[DisciplineBlockUnload]
+    removed: list[DisciplineBlockUnload]
+    changed: list[MapDiffChangedBlock]
+    unchanged_count: Annotated[int, Field(example=37)]
+
+
+class MapVersionRead(BaseModel):
+    plan_version: Annotated[int, Field(example=12)]
+    full: Annotated[bool, Field(example=False, description='The version is stored in full, not as a delta')]
+    size: Annotated[int, Field(example=1840, description='Size of the stored (compressed) record in bytes')]
+    created_at: datetime
@@ -0,0 +1,63 @@
+import orjson
+from sqlalchemy import Row
+from .schemas import (
+    MapCoreUnload, DisciplineBlockUnload, DisciplineUnload, DepartmentUnload, ControlTypeUnload, CompetencyUnload
+)
+
+
+def dump_json(content) -> bytes:
+    """Serialize plain data the same way as the default ORJSONResponse does."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def discipline_block_data(row: Row, departments: dict, control_types: dict) -> dict:
+    """
+    Build the DisciplineBlockUnload-shaped dict of the block row without competencies.
+    Department and control type names come from the row itself, so a stored snapshot never embeds
+    an outdated in-memory copy of the reference data; the given dicts are shared by all blocks
+    of one unload, so equal objects are built once.
+    """
+    if row.department_id not in departments:
+        departments[row.department_id] = {
+            'id': row.department_id, 'name': row.department_name, 'short_name': row.department_short_name
+        }
+    if row.control_type_id not in control_types:
+        control_types[row.control_type_id] = {'id': row.control_type_id, 'name': row.control_type_name}
+
+    return {
+        'id': row.id,
+        'discipline': {
+            'id': row.discipline_id,
+            'name': row.discipline_name,
+            'short_name': row.discipline_short_name,
+            'department': departments[row.department_id]
+        },
+        'credit_units': row.credit_units,
+        'control_type': control_types[row.control_type_id],
+        'lecture_hours': row.lecture_hours,
+        'practice_hours': row.practice_hours,
+        'lab_hours': row.lab_hours,
+        'semester_number': row.semester_number,
+        'competencies': []
+    }
+
+
+def _construct_discipline_block_unload(data: dict) -> DisciplineBlockUnload:
+    discipline = data['discipline']
+    return DisciplineBlockUnload.model_construct(**{
+        **data,
+        'discipline': DisciplineUnload.model_construct(**{
+            **discipline,
+            'department': discipline['department'] and DepartmentUnload.model_construct(**discipline['department'])
+        }),
+        'control_type': data['control_type'] and ControlTypeUnload.model_construct(**data['control_type']),
+        'competencies': [CompetencyUnload.model_construct(**competency) for competency in data['competencies']]
+    })
+
+
+def construct_map_core_unload(data: dict) -> MapCoreUnload:
+    """Build unload schemas from trusted rows without validation (model_construct)."""
+    return MapCoreUnload.model_construct(**{
+        **data,
+        'discipline_blocks': [_construct_discipline_block_unload(block) for block in data['discipline_blocks']]
+    })
@@ -1,3 +1,6 @@
+import gzip
+from collections.abc import Iterator
+import orjson
 from src.directions.repository import DirectionsRepository
 from src.map_cors.repository import MapCorsRepository
 from src.direction_map_cors.repository import DirectionMapCorsRepository
@@ -7,11 +10,29 @@ from src.disciplines.repository import DisciplinesRepository
 from src.departments.repository import DepartmentsRepository
 from src.control_types.repository import ControlTypesRepository
 from src.competencies.repository import CompetenciesRepository
-from .schemas import (
-    MapLoad, MapUnload, MapCoreUnload, DisciplineBlockUnload, DisciplineUnload, DepartmentUnload, ControlTypeUnload,
-    CompetencyUnload
+from sqlalchemy import select, insert, delete, func, literal
+from src.map_cors.model import MapCore
+from src.direction_map_cors.model import DirectionMapCore
+from src.discipline_blocks.model import DisciplineBlock
+from src.discipline_block_competencies.model import DisciplineBlockCompetency
+from src.disciplines.model import Discipline
+from src.competencies.model import Competency
+from src.departments.model import Department
+from src.control_types.model import ControlType
+from .schemas import MapLoad, MapUnload, MapCoreUnload, MapClone, MapVersionRead
+from .serialization import construct_map_core_unload, discipline_block_data, dump_json
+from src.exceptions import (
+    DirectionNotFoundException, MapCoreNotFoundException, MapCloneSourceIsTargetException,
+    PlanVersionNotFoundException, PlanVersionConflictException
+)
+from .revisions import bump_plan_version, get_plan_version
+from .snapshots import get_plan_snapshot, write_plan_snapshot
+from .diff import diff_plans
+from .locks import lock_direction_plan
+from .streaming import stream_map_ndjson
+from .history import (
+    plan_state, record_plan_version, get_latest_recorded_version, get_plan_state, list_plan_versions
 )
-from src.exceptions import DirectionNotFoundException, MapCoreNotFoundException
 
 
 class MapsService:
@@ -39,9 +60,15 @@ class MapsService:
         self.competencies_repository: CompetenciesRepository = competencies_repository
 
     def load_map(self, direction_id: int, data: MapLoad) -> None:
+        session = self.directions_repository.session
 
-        if not self.directions_repository.get_by_id(direction_id):
+        # сохранения одного направления выполняются по очереди, версия плана проверяется уже под блокировкой
+        plan_version = lock_direction_plan(session, direction_id)
+        if plan_version is None:
             raise DirectionNotFoundException()
+        if data.version is not None and data.version != plan_version:
+            raise PlanVersionConflictException()
+        self._record_edited_plan_version(direction_id, plan_version)
 
         # если есть связанные с направлением ядра карты, удаляем связи, но ядра пока остаются в БД
         if direction_map_cors := self.direction_map_cors_repository.filter_by(direction_id=direction_id):
@@ -101,107 +128,310 @@ class MapsService:
                         'competency_id': competency.id
                     })
 
-    def unload_map_core(self, map_core_id: int) -> MapCoreUnload:
-        if not self.map_cors_repository.get_by_id(map_core_id):
-            raise MapCoreNotFoundException()
-
-        # получаем ядро карты
-        map_core = self.map_cors_repository.get_by_id(map_core_id)
-
-        # получаем блоки дисциплин внутри ядра
-        discipline_blocks = self.discipline_blocks_repository.filter_by(map_core_id=map_core.id)
+        # фиксируем новую версию плана направления, чтобы сбросить производные от него данные,
+        # и в той же транзакции сохраняем собранный снимок плана для чтения
+        plan_version = bump_plan_version(session, direction_id)
+        self._save_plan_version(direction_id, plan_version)
+        session.commit()
+
+    def clone_map(self, direction_id: int, source_direction_id: int) -> MapClone:
+        """
+        Replace the direction's map with a copy of the source direction's map: map cores, discipline blocks
+        and their competencies are copied by a single INSERT ... SELECT statement with data-modifying CTEs,
+        new ids are taken from the sequences inside the statement. Previous map cores of the direction
+        are unlinked but stay in the database, as in load_map.
+        """
+        if direction_id == source_direction_id:
+            raise MapCloneSourceIsTargetException()
+
+        session = self.directions_repository.session
+        plan_version = lock_direction_plan(session, direction_id)
+        if plan_version is None or get_plan_version(session, source_direction_id) is None:
+            raise DirectionNotFoundException()
+        self._record_edited_plan_version(direction_id, plan_version)
+
+        session.execute(delete(DirectionMapCore).where(DirectionMapCore.direction_id == direction_id))
+
+        # старый id -> новый id выдается через nextval прямо в CTE, поэтому связи переносятся без обращений к ORM
+        source_cors = (
+            select(
+                DirectionMapCore.id.label('link_id'),
+                MapCore.id.label('old_id'),
+                func.nextval(func.pg_get_serial_sequence(MapCore.__tablename__, 'id')).label('new_id'),
+                MapCore.name,
+                MapCore.semesters_count
+            )
+            .join(MapCore, MapCore.id == DirectionMapCore.map_core_id)
+            .where(DirectionMapCore.direction_id == source_direction_id)
+            .order_by(DirectionMapCore.id)
+            .cte('source_cors')
+        )
+        inserted_cors = (
+            insert(MapCore)
+            .from_select(
+                ['id', 'name', 'semesters_count'],
+                select(source_cors.c.new_id, source_cors.c.name, source_cors.c.semesters_count)
+            )
+            .returning(MapCore.id)
+            .cte('inserted_cors')
+        )
+        inserted_links = (
+            insert(DirectionMapCore)
+            .from_select(
+                ['direction_id', 'map_core_id'],
+                select(literal(direction_id), source_cors.c.new_id).order_by(source_cors.c.link_id)
+            )
+            .returning(DirectionMapCore.id)
+            .cte('inserted_links')
+        )
 
-        discipline_blocks_unload = []
-        for discipline_block in discipline_blocks:
+        block_columns = [
+            'discipline_id', 'credit_units', 'control_type_id', 'lecture_hours', 'practice_hours', 'lab_hours',
+            'semester_number'
+        ]
+        source_blocks = (
+            select(
+                DisciplineBlock.id.label('old_id'),
+                func.nextval(func.pg_get_serial_sequence(DisciplineBlock.__tablename__, 'id')).label('new_id'),
+                source_cors.c.new_id.label('map_core_id'),
+                *(getattr(DisciplineBlock, column) for column in block_columns)
+            )
+            .join(source_cors, source_cors.c.old_id == DisciplineBlock.map_core_id)
+            .order_by(DisciplineBlock.id)
+            .cte('source_blocks')
+        )
+        inserted_blocks = (
+            insert(DisciplineBlock)
+            .from_select(
+                ['id', 'map_core_id', *block_columns],
+                select(
+                    source_blocks.c.new_id, source_blocks.c.map_core_id,
+                    *(source_blocks.c[column] for column in block_columns)
+                )
+            )
+            .returning(DisciplineBlock.id)
+            .cte('inserted_blocks')
+        )
+        inserted_competencies = (
+            insert(DisciplineBlockCompetency)
+            .from_select(
+                ['discipline_block_id', 'competency_id'],
+                select(source_blocks.c.new_id, DisciplineBlockCompetency.competency_id)
+                .join(source_blocks, source_blocks.c.old_id == DisciplineBlockCompetency.discipline_block_id)
+                .order_by(DisciplineBlockCompetency.id)
+            )
+            .returning(DisciplineBlockCompetency.id)
+            .cte('inserted_competencies')
+        )
 
-            # получаем дисциплину блока
-            discipline = self.disciplines_repository.get_by_id(discipline_block.discipline_id)
+        def count(cte):
+            return select(func.count()).select_from(cte).scalar_subquery()
+
+        # ссылки на все CTE из итогового SELECT гарантируют, что PostgreSQL выполнит каждую вставку
+        counts = session.execute(
+            select(count(inserted_cors), count(inserted_blocks), count(inserted_competencies))
+            .add_cte(inserted_links)
+        ).one()
+
+        plan_version = bump_plan_version(session, direction_id)
+        self._save_plan_version(direction_id, plan_version)
+        session.commit()
+
+        return MapClone(
+            direction_id=direction_id,
+            source_direction_id=source_direction_id,
+            plan_version=plan_version,
+            map_cors=counts[0],
+            discipline_blocks=counts[1],
+            discipline_block_competencies=counts[2]
+        )
 
-            # получаем кафедру дисциплины
-            department = self.departments_repository.get_by_id(discipline.department_id)
+    def _save_plan_version(self, direction_id: int, plan_version: int) -> None:
+        """Store the snapshot of the just saved plan version for reading and append it to the plan history."""
+        session = self.directions_repository.session
+        content = self._assemble_map_json(direction_id)
+        write_plan_snapshot(session, direction_id, plan_version, content)
+        record_plan_version(session, direction_id, plan_version, plan_state(orjson.loads(content)['map_cors']))
+
+    def _record_edited_plan_version(self, direction_id: int, plan_version: int) -> None:
+        """
+        Append the current plan version to the history before it is replaced, if it is missing there,
+        e.g. a version made before the history was kept.
+        """
+        session = self.directions_repository.session
+        latest = get_latest_recorded_version(session, direction_id)
+        if not plan_version or (latest is not None and latest.plan_version >= plan_version):
+            return
+
+        # снимок здесь не пересобирается с фиксацией транзакции: это сняло бы блокировку сохранения
+        snapshot = get_plan_snapshot(session, direction_id)
+        content = gzip.decompress(snapshot.content) if snapshot.content is not None \
+            else self._assemble_map_json(direction_id)
+        record_plan_version(session, direction_id, plan_version, plan_state(orjson.loads(content)['map_cors']))
+
+    def get_map_version(self, direction_id: int) -> int:
+        plan_version = get_plan_version(self.directions_repository.session, direction_id)
+        if plan_version is None:
+            raise DirectionNotFoundException()
+        return plan_version
 
-            # получаем объект кафедры для выгрузки
-            department_unload = DepartmentUnload.model_validate(department)
+    def list_map_versions(self, direction_id: int) -> list[MapVersionRead]:
+        session = self.directions_repository.session
+        if get_plan_version(session, direction_id) is None:
+            raise DirectionNotFoundException()
+        return [MapVersionRead.model_construct(**row._mapping) for row in list_plan_versions(session, direction_id)]
 
-            # получаем объект дисциплины для выгрузки
-            discipline_unload = DisciplineUnload(
-                id=discipline.id,
-                name=discipline.name,
-                short_name=discipline.short_name,
-                department=department_unload
+    def get_map_version_json(self, direction_id: int, plan_version: int) -> bytes:
+        """Return the plan of the version in the MapLoad format, so it can be loaded back to roll the plan back."""
+        session = self.directions_repository.session
+        current_version = get_plan_version(session, direction_id)
+        if current_version is None:
+            raise DirectionNotFoundException()
+        state = get_plan_state(session, direction_id, plan_version)
+        if state is None:
+            # текущая версия может быть еще не записана в историю, ее план берется из снимка
+            if plan_version != current_version:
+                raise PlanVersionNotFoundException()
+            state = plan_state(self.unload_map_data(direction_id)['map_cors'])
+        return dump_json({'direction_id': direction_id, **state})
+
+    def _unload_map_cors_data(self, map_core_ids: list[int]) -> list[dict]:
+        """
+        Load the map cores with their discipline blocks and competencies in three set-based queries
+        and return them as plain dicts shaped like MapCoreUnload. Rows come from our own database,
+        so they are not validated again.
+        """
+        session = self.map_cors_repository.session
+
+        map_cors = {
+            row.id: {'id': row.id, 'name': row.name, 'semesters_count': row.semesters_count, 'discipline_blocks': []}
+            for row in session.execute(
+                select(MapCore.id, MapCore.name, MapCore.semesters_count).where(MapCore.id.in_(map_core_ids))
             )
-
-            # получаем вид контроля для блока дисциплины
-            control_type = self.control_types_repository.get_by_id(discipline_block.control_type_id)
-
-            # получаем вид контроля для выгрузки
-            control_type_unload = ControlTypeUnload.model_validate(control_type)
-
-            # получаем связи блока дисциплины с компетенциями
-            discipline_block_competencies = self.discipline_block_competencies_repository.filter_by(
-                discipline_block_id=discipline_block.id
+        }
+
+        departments = {}
+        control_types = {}
+        discipline_blocks = {}
+        blocks_stmt = (
+            select(
+                DisciplineBlock.id, DisciplineBlock.map_core_id, DisciplineBlock.control_type_id,
+                DisciplineBlock.credit_units, DisciplineBlock.lecture_hours, DisciplineBlock.practice_hours,
+                DisciplineBlock.lab_hours, DisciplineBlock.semester_number,
+                Discipline.id.label('discipline_id'), Discipline.name.label('discipline_name'),
+                Discipline.short_name.label('discipline_short_name'), Discipline.department_id,
+                Department.name.label('department_name'), Department.short_name.label('department_short_name'),
+                ControlType.name.label('control_type_name')
             )
-
-            competencies_unload = []
-            for discipline_block_competency in discipline_block_competencies:
-                # получаем компетенцию
-                competency = self.competencies_repository.get_by_id(discipline_block_competency.competency_id)
-
-                if not competency:
-                    continue
-
-                # формируем объект компетенции для выгрузки
-                competency_unload = CompetencyUnload(
-                    id=competency.id,
-                    code=competency.code,
-                    name=competency.name,
-                    description=competency.description,
-                    competency_group_id=competency.competency_group_id
-                )
-
-                # формируем список компетенций для выгрузки
-                competencies_unload.append(competency_unload)
-
-            # формируем объект блока дисциплины для выгрузки
-            discipline_block_unload = DisciplineBlockUnload(
-                id=discipline_block.id,
-                discipline=discipline_unload,
-                credit_units=discipline_block.credit_units,
-                control_type=control_type_unload,
-                lecture_hours=discipline_block.lecture_hours,
-                practice_hours=discipline_block.practice_hours,
-                lab_hours=discipline_block.lab_hours,
-                semester_number=discipline_block.semester_number,
-                competencies=competencies_unload
+            .join(Discipline, Discipline.id == DisciplineBlock.discipline_id)
+            .join(Department, Department.id == Discipline.department_id)
+            .join(ControlType, ControlType.id == DisciplineBlock.control_type_id)
+            .where(DisciplineBlock.map_core_id.in_(map_core_ids))
+            .order_by(DisciplineBlock.id)
+        )
+        for row in session.execute(blocks_stmt):
+            discipline_block = discipline_block_data(row, departments, control_types)
+            discipline_blocks[row.id] = discipline_block
+            map_cors[row.map_core_id]['discipline_blocks'].append(discipline_block)
+
+        competencies_stmt = (
+            select(
+                DisciplineBlockCompetency.discipline_block_id, Competency.id, Competency.code, Competency.name,
+                Competency.description, Competency.competency_group_id
             )
-
-            # формируем список блоков дисциплин для выгрузки
-            discipline_blocks_unload.append(discipline_block_unload)
-
-        # формируем объект ядра карты для выгрузки
-        map_core_unload = MapCoreUnload(
-            id=map_core.id,
-            name=map_core.name,
-            semesters_count=map_core.semesters_count,
-            discipline_blocks=discipline_blocks_unload
+            .join(Competency, Competency.id == DisciplineBlockCompetency.competency_id)
+            .join(DisciplineBlock, DisciplineBlock.id == DisciplineBlockCompetency.discipline_block_id)
+            .where(DisciplineBlock.map_core_id.in_(map_core_ids))
+            .order_by(DisciplineBlockCompetency.id)
         )
+        for row in session.execute(competencies_stmt):
+            discipline_blocks[row.discipline_block_id]['competencies'].append({
+                'id': row.id,
+                'code': row.code,
+                'name': row.name,
+                'description': row.description,
+                'competency_group_id': row.competency_group_id
+            })
 
-        return map_core_unload
+        return [map_cors[map_core_id] for map_core_id in map_core_ids if map_core_id in map_cors]
 
-    def unload_map(self, direction_id) -> MapUnload:
-        if not self.directions_repository.get_by_id(direction_id):
-            raise DirectionNotFoundException()
+    def _direction_map_core_ids(self, direction_id: int) -> list[int]:
+        return list(self.direction_map_cors_repository.session.execute(
+            select(DirectionMapCore.map_core_id)
+            .where(DirectionMapCore.direction_id == direction_id)
+            .order_by(DirectionMapCore.id)
+        ).scalars())
 
-        # получаем все связанные с направлением ядра
-        direction_map_cors = self.direction_map_cors_repository.filter_by(direction_id=direction_id)
+    def _assemble_map_json(self, direction_id: int) -> bytes:
+        return dump_json({'map_cors': self._unload_map_cors_data(self._direction_map_core_ids(direction_id))})
 
-        map_cors_unload = []
-        for direction_map_core in direction_map_cors:
+    def _unload_map_core_data(self, map_core_id: int) -> dict:
+        map_cors = self._unload_map_cors_data([map_core_id])
+        if not map_cors:
+            raise MapCoreNotFoundException()
+        return map_cors[0]
+
+    def unload_map_core(self, map_core_id: int) -> MapCoreUnload:
+        return construct_map_core_unload(self._unload_map_core_data(map_core_id))
+
+    def unload_map_core_json(self, map_core_id: int) -> bytes:
+        return dump_json(self._unload_map_core_data(map_core_id))
+
+    def unload_map_gzip(self, direction_id: int) -> bytes:
+        """
+        Return the gzip-compressed unload JSON from the plan snapshot.
+        A missing or outdated snapshot (its plan version differs from the direction's) is rebuilt and stored.
+        """
+        snapshot = get_plan_snapshot(self.directions_repository.session, direction_id)
+        if snapshot is None:
+            raise DirectionNotFoundException()
+        if snapshot.content is not None:
+            return snapshot.content
 
-            # получаем объект ядра карты для выгрузки
-            map_core_unload = self.unload_map_core(direction_map_core.map_core_id)
+        session = self.directions_repository.session
+        content = write_plan_snapshot(
+            session, direction_id, snapshot.plan_version, self._assemble_map_json(direction_id)
+        )
+        session.commit()
+        return content
+
+    def unload_map_json(self, direction_id: int) -> bytes:
+        return gzip.decompress(self.unload_map_gzip(direction_id))
+
+    def unload_map_data(self, direction_id: int) -> dict:
+        """Return the unload as plain data (MapUnload dict), e.g. for encoding into another format."""
+        return orjson.loads(self.unload_map_json(direction_id))
+
+    def stream_map(self, direction_id: int) -> Iterator[bytes]:
+        """
+        Return the NDJSON stream of the direction's map cores. The direction is checked right away,
+        so a missing one is reported with 404 before the response starts.
+        """
+        if get_plan_version(self.directions_repository.session, direction_id) is None:
+            raise DirectionNotFoundException()
+        return stream_map_ndjson(direction_id)
+
+    def unload_map(self, direction_id: int) -> MapUnload:
+        map_cors = self.unload_map_data(direction_id)['map_cors']
+        return MapUnload.model_construct(map_cors=[construct_map_core_unload(map_core) for map_core in map_cors])
+
+    def diff_maps_json(self, left_direction_id: int, right_direction_id: int) -> bytes:
+        """
+        Compare the plans of two directions; both are read from their snapshots (a query each),
+        so the comparison itself does not touch the plan tables.
+        """
+        diff = diff_plans(
+            orjson.loads(self.unload_map_json(left_direction_id))['map_cors'],
+            orjson.loads(self.unload_map_json(right_direction_id))['map_cors']
+        )
+        return dump_json({'left_direction_id': left_direction_id, 'right_direction_id': right_direction_id, **diff})
 
-            # формируем список ядер карты для выгрузки
-            map_cors_unload.append(map_core_unload)
+    def rebuild_plan_snapshot(self, direction_id: int) -> None:
+        """Rebuild the snapshot of the direction's plan, e.g. after reference data changed."""
+        session = self.directions_repository.session
+        plan_version = get_plan_version(session, direction_id)
+        if plan_version is None:
+            raise DirectionNotFoundException()
 
-        return MapUnload(map_cors=map_cors_unload)
+        write_plan_snapshot(session, direction_id, plan_version, self._assemble_map_json(direction_id))
+        session.commit()
@@ -0,0 +1,48 @@
+import gzip
+from sqlalchemy import select, delete, and_, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from src.directions.model import Direction
+from .model import PlanSnapshot
+
+# снимок сжимается при каждом сохранении плана; 6 - уровень zlib по умолчанию, дальше сжатие заметно медленнее
+# при небольшом выигрыше в размере
+COMPRESS_LEVEL = 6
+
+
+def get_plan_snapshot(session: Session, direction_id: int) -> Row | None:
+    """
+    Return (plan_version, content) of the direction, where content is the gzip-compressed unload JSON
+    or None if there is no snapshot of the current plan version; None if the direction does not exist.
+    """
+    stmt = (
+        select(Direction.plan_version, PlanSnapshot.content)
+        .outerjoin(PlanSnapshot, and_(
+            PlanSnapshot.direction_id == Direction.id, PlanSnapshot.plan_version == Direction.plan_version
+        ))
+        .where(Direction.id == direction_id)
+    )
+    return session.execute(stmt).one_or_none()
+
+
+def write_plan_snapshot(session: Session, direction_id: int, plan_version: int, content: bytes) -> bytes:
+    """Compress and store the unload JSON of the plan within the current transaction; return the stored bytes."""
+    compressed = gzip.compress(content, compresslevel=COMPRESS_LEVEL, mtime=0)
+    stmt = insert(PlanSnapshot).values(direction_id=direction_id, plan_version=plan_version, content=compressed)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PlanSnapshot.direction_id],
+        set_={'plan_version': stmt.excluded.plan_version, 'content': stmt.excluded.content, 'updated_at': func.now()},
+        # снимок, собранный по более старой версии плана, не должен затирать более новый
+        where=PlanSnapshot.plan_version <= stmt.excluded.plan_version
+    )
+    session.execute(stmt)
+    return compressed
+
+
+def invalidate_plan_snapshots(session: Session) -> None:
+    """
+    Drop all snapshots within the current transaction, e.g. when reference data embedded
+    into them (discipline names, departments, competencies) changes; they are rebuilt on the next read.
+    """
+    session.execute(delete(PlanSnapshot))
@@ -0,0 +1,129 @@
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from src.database import SessionLocal
+from src.direction_map_cors.model import DirectionMapCore
+from src.map_cors.model import MapCore
+from src.discipline_blocks.model import DisciplineBlock
+from src.discipline_block_competencies.model import DisciplineBlockCompetency
+from src.disciplines.model import Discipline
+from src.competencies.model import Competency
+from src.departments.model import Department
+from src.control_types.model import ControlType
+from src.exceptions import PlanVersionConflictException
+from .revisions import get_plan_version
+from .serialization import discipline_block_data, dump_json
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+# сколько ядер карты читается за одно обращение к БД; соединение возвращается в пул до отправки их клиенту
+STREAM_BATCH_SIZE = int(os.getenv('MAP_STREAM_BATCH_SIZE', '20'))
+
+
+@contextmanager
+def _snapshot_session() -> Iterator[Session]:
+    """Short session whose queries all see the same snapshot of the database."""
+    with SessionLocal() as session:
+        session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+        yield session
+
+
+def _competencies_subquery():
+    """Correlated subquery with the JSON array of the block's competencies in the CompetencyUnload format."""
+    competency = func.json_build_object(
+        'id', Competency.id,
+        'code', Competency.code,
+        'name', Competency.name,
+        'description', Competency.description,
+        'competency_group_id', Competency.competency_group_id
+    )
+    return (
+        select(func.coalesce(
+            func.json_agg(aggregate_order_by(competency, DisciplineBlockCompetency.id)), func.json_build_array()
+        ))
+        .join(Competency, Competency.id == DisciplineBlockCompetency.competency_id)
+        .where(DisciplineBlockCompetency.discipline_block_id == DisciplineBlock.id)
+        .correlate(DisciplineBlock)
+        .scalar_subquery()
+    )
+
+
+def _read_map_cors(direction_id: int) -> tuple[int | None, list]:
+    """Return the plan version of the direction and the map cores of this version in the order of the map."""
+    stmt = (
+        select(
+            DirectionMapCore.id.label('link_id'), MapCore.id, MapCore.name, MapCore.semesters_count
+        )
+        .join(MapCore, MapCore.id == DirectionMapCore.map_core_id)
+        .where(DirectionMapCore.direction_id == direction_id)
+        .order_by(DirectionMapCore.id)
+    )
+    with _snapshot_session() as session:
+        return get_plan_version(session, direction_id), session.execute(stmt).all()
+
+
+def _read_discipline_blocks(direction_id: int, map_core_ids: list[int]) -> tuple[int | None, dict[int, list[dict]]]:
+    """
+    Return the plan version of the direction and the discipline blocks of the map cores of this version
+    grouped by map core, each in the order of the map.
+    """
+    stmt = (
+        select(
+            DisciplineBlock.map_core_id, DisciplineBlock.id, DisciplineBlock.control_type_id,
+            DisciplineBlock.credit_units, DisciplineBlock.lecture_hours, DisciplineBlock.practice_hours,
+            DisciplineBlock.lab_hours, DisciplineBlock.semester_number,
+            Discipline.id.label('discipline_id'), Discipline.name.label('discipline_name'),
+            Discipline.short_name.label('discipline_short_name'), Discipline.department_id,
+            Department.name.label('department_name'), Department.short_name.label('department_short_name'),
+            ControlType.name.label('control_type_name'),
+            _competencies_subquery().label('competencies')
+        )
+        .select_from(DisciplineBlock)
+        .outerjoin(Discipline, Discipline.id == DisciplineBlock.discipline_id)
+        .outerjoin(Department, Department.id == Discipline.department_id)
+        .outerjoin(ControlType, ControlType.id == DisciplineBlock.control_type_id)
+        .where(DisciplineBlock.map_core_id.in_(map_core_ids))
+        .order_by(DisciplineBlock.id)
+    )
+    departments = {}
+    control_types = {}
+    discipline_blocks = {map_core_id: [] for map_core_id in map_core_ids}
+    with _snapshot_session() as session:
+        plan_version = get_plan_version(session, direction_id)
+        for row in session.execute(stmt):
+            discipline_block = discipline_block_data(row, departments, control_types)
+            discipline_block['competencies'] = row.competencies
+            discipline_blocks[row.map_core_id].append(discipline_block)
+    return plan_version, discipline_blocks
+
+
+def stream_map_ndjson(direction_id: int) -> Iterator[bytes]:
+    """
+    Yield the direction's map as NDJSON: one MapCoreUnload object per line in the order of the map,
+    so a client can render the map progressively. Map cores are read in batches of STREAM_BATCH_SIZE,
+    each in its own short session, and the connection is back in the pool before the batch is sent:
+    a slow client does not hold a pooled connection or an open transaction. Each batch is read together
+    with the plan version; if the plan was saved during the stream, it ends with an error line
+    {"detail": ..., "plan_version": ...} instead of mixing two versions, and the client has to reload the map.
+    """
+    plan_version, map_cors = _read_map_cors(direction_id)
+    for offset in range(0, len(map_cors), STREAM_BATCH_SIZE):
+        batch = map_cors[offset:offset + STREAM_BATCH_SIZE]
+        current_version, discipline_blocks = _read_discipline_blocks(
+            direction_id, list({map_core.id for map_core in batch})
+        )
+        if current_version != plan_version:
+            yield dump_json({
+                'detail': PlanVersionConflictException().detail, 'plan_version': current_version
+            }) + b'\n'
+            return
+        # ядро может входить в карту несколько раз, тогда оно выводится на каждом своем месте
+        for map_core in batch:
+            yield dump_json({
+                'id': map_core.id,
+                'name': map_core.name,
+                'semesters_count': map_core.semesters_count,
+                'discipline_blocks': discipline_blocks[map_core.id]
+            }) + b'\n'
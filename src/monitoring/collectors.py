@@ -0,0 +1,60 @@
+from anyio import to_thread
+from sqlalchemy.engine import Engine
+from src.core.cache import caches
+from src.database import engine as default_engine
+from src.reference_data.snapshot import reference_data
+from .metrics import (
+    THREADPOOL_TOKENS_BORROWED, THREADPOOL_TOKENS_TOTAL, DB_POOL_SIZE, DB_POOL_CHECKED_OUT, DB_POOL_CHECKED_IN,
+    DB_POOL_OVERFLOW, CACHE_HITS, CACHE_MISSES, CACHE_ENTRIES
+)
+
+# сколько попаданий и промахов каждого кэша уже учтено в счетчиках Prometheus
+_reported_cache_stats: dict[str, tuple[int, int]] = {}
+
+
+def update_threadpool_metrics() -> None:
+    """Must be called from the event loop thread."""
+    limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_TOKENS_BORROWED.set(limiter.borrowed_tokens)
+    THREADPOOL_TOKENS_TOTAL.set(limiter.total_tokens)
+
+
+def update_db_pool_metrics(engine: Engine = default_engine) -> None:
+    pool = engine.pool
+    for gauge, getter in (
+            (DB_POOL_SIZE, 'size'),
+            (DB_POOL_CHECKED_OUT, 'checkedout'),
+            (DB_POOL_CHECKED_IN, 'checkedin'),
+            (DB_POOL_OVERFLOW, 'overflow'),
+    ):
+        if hasattr(pool, getter):
+            gauge.set(getattr(pool, getter)())
+
+
+def update_cache_metrics() -> None:
+    """
+    Transfer hits and misses counted by the caches since the previous call to the Prometheus counters:
+    the caches keep plain integers, so the hot path does not touch the metric files.
+    """
+    stats = [(cache.name, cache.hits, cache.misses) for cache in caches]
+    stats.append(('reference_data', reference_data.hits, reference_data.misses))
+    for name, hits, misses in stats:
+        reported_hits, reported_misses = _reported_cache_stats.get(name, (0, 0))
+        if hits > reported_hits:
+            CACHE_HITS.labels(name).inc(hits - reported_hits)
+        if misses > reported_misses:
+            CACHE_MISSES.labels(name).inc(misses - reported_misses)
+        _reported_cache_stats[name] = (hits, misses)
+    for cache in caches:
+        CACHE_ENTRIES.labels(cache.name).set(len(cache))
+
+
+def update_process_metrics() -> None:
+    """
+    Copy the state of this process (thread pool, connection pool, caches) to the metrics.
+    Called after every request, so with several workers the merged metrics include idle workers too.
+    Must be called from the event loop thread.
+    """
+    update_threadpool_metrics()
+    update_db_pool_metrics()
+    update_cache_metrics()
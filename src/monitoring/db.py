@@ -0,0 +1,53 @@
+import re
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .metrics import DB_QUERY_DURATION
+
+
+IN_LIST_RE = re.compile(r'\(\s*%\(\w+\)s(?:\s*,\s*%\(\w+\)s)+\s*\)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+@dataclass
+class RequestDbStats:
+    queries: int = 0
+    duration: float = 0.0
+    # форма каждого выполненного запроса -> количество выполнений, собирается только в режиме отладки
+    shapes: Counter | None = None
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize the SQL statement so that executions differing only in parameters look the same."""
+    return IN_LIST_RE.sub('(...)', WHITESPACE_RE.sub(' ', statement)).strip()
+
+
+# статистика запросов к БД в рамках текущего HTTP-запроса;
+# объект изменяемый, поэтому он общий для корутины и потока, в котором выполняется синхронный роут
+request_db_stats: ContextVar[RequestDbStats | None] = ContextVar('request_db_stats', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = perf_counter() - context._query_started_at
+    DB_QUERY_DURATION.observe(duration)
+
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.duration += duration
+        if stats.shapes is not None:
+            stats.shapes[statement_shape(statement)] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
@@ -0,0 +1,59 @@
+import logging
+import os
+from collections import Counter
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from .db import RequestDbStats, request_db_stats
+
+logger = logging.getLogger(__name__)
+
+DB_QUERY_DEBUG = os.getenv('DB_QUERY_DEBUG', '0') == '1'
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '5'))
+
+
+def find_repeated_statements(shapes: Counter, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+    """Return statement shapes executed at least threshold times, the most frequent first."""
+    return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+class QueryDebugMiddleware:
+    """
+    ASGI middleware for development: adds X-DB-Queries and X-DB-Time (ms) headers to every response
+    and logs statements repeated within one request, which usually indicates an N+1 pattern.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        # статистику может уже собирать MetricsMiddleware, тогда дополняем ее
+        stats = request_db_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestDbStats()
+            token = request_db_stats.set(stats)
+        stats.shapes = Counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers['X-DB-Queries'] = str(stats.queries)
+                headers['X-DB-Time'] = f'{stats.duration * 1000:.1f}'
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                request_db_stats.reset(token)
+
+            for shape, count in find_repeated_statements(stats.shapes, self.n_plus_one_threshold):
+                logger.warning(
+                    'Possible N+1: statement executed %d times during %s %s: %s',
+                    count, scope['method'], scope['path'], shape
+                )
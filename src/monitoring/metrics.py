@@ -0,0 +1,80 @@
+import os
+from prometheus_client import CollectorRegistry, Counter, Histogram, Gauge, REGISTRY
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# при запуске несколькими воркерами (gunicorn.conf.py) каждый процесс пишет значения метрик в файлы этого каталога,
+# а /metrics суммирует их по всем воркерам; у gauge-метрик multiprocess_mode задает способ объединения
+PROMETHEUS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency',
+    ['method', 'route', 'status']
+)
+HTTP_REQUEST_SIZE = Histogram(
+    'http_request_size_bytes',
+    'HTTP request body size',
+    ['method', 'route'],
+    buckets=SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'HTTP response body size',
+    ['method', 'route'],
+    buckets=SIZE_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'HTTP requests being processed',
+    multiprocess_mode='livesum'
+)
+
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds',
+    'Duration of a single SQL statement'
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request',
+    'Number of SQL statements executed while handling an HTTP request',
+    ['method', 'route'],
+    buckets=QUERIES_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'db_time_per_request_seconds',
+    'Total SQL execution time while handling an HTTP request',
+    ['method', 'route']
+)
+
+THREADPOOL_TOKENS_BORROWED = Gauge(
+    'threadpool_tokens_borrowed',
+    'Worker threads of the default anyio thread pool currently running sync routes',
+    multiprocess_mode='livesum'
+)
+THREADPOOL_TOKENS_TOTAL = Gauge(
+    'threadpool_tokens_total',
+    'Size of the default anyio thread pool',
+    multiprocess_mode='livesum'
+)
+
+DB_POOL_SIZE = Gauge('db_pool_size', 'Configured size of the connection pool', multiprocess_mode='livesum')
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Connections currently checked out of the pool', multiprocess_mode='livesum'
+)
+DB_POOL_CHECKED_IN = Gauge('db_pool_checked_in', 'Idle connections in the pool', multiprocess_mode='livesum')
+DB_POOL_OVERFLOW = Gauge('db_pool_overflow', 'Connections opened above the pool size', multiprocess_mode='livesum')
+
+CACHE_HITS = Counter('cache_hits', 'Cache hits', ['cache'])
+CACHE_MISSES = Counter('cache_misses', 'Cache misses', ['cache'])
+CACHE_ENTRIES = Gauge('cache_entries', 'Number of cached entries', ['cache'], multiprocess_mode='livesum')
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Return the registry to expose: the default one or, with several workers, the one merging all workers."""
+    if PROMETHEUS_MULTIPROC_DIR is None:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
@@ -0,0 +1,61 @@
+from time import perf_counter
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from .collectors import update_process_metrics
+from .db import RequestDbStats, request_db_stats
+from .metrics import (
+    HTTP_REQUEST_DURATION, HTTP_REQUEST_SIZE, HTTP_RESPONSE_SIZE, HTTP_REQUESTS_IN_PROGRESS, DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records latency, payload sizes and DB usage of every HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_size = 0
+        response_size = 0
+        status_code = 500
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message['type'] == 'http.request':
+                request_size += len(message.get('body', b''))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_size, status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
+
+        stats = RequestDbStats()
+        token = request_db_stats.set(stats)
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started_at = perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = perf_counter() - started_at
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            request_db_stats.reset(token)
+
+            # используем шаблон пути роута, а не фактический путь, чтобы не плодить метки
+            route = scope.get('route')
+            route_path = getattr(route, 'path', 'unmatched')
+            method = scope['method']
+            HTTP_REQUEST_DURATION.labels(method, route_path, str(status_code)).observe(duration)
+            HTTP_REQUEST_SIZE.labels(method, route_path).observe(request_size)
+            HTTP_RESPONSE_SIZE.labels(method, route_path).observe(response_size)
+            DB_QUERIES_PER_REQUEST.labels(method, route_path).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(method, route_path).observe(stats.duration)
+            update_process_metrics()
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from .collectors import update_process_metrics
+from .metrics import metrics_registry
+
+router = APIRouter(
+    tags=['monitoring']
+)
+
+
+@router.get('/metrics', include_in_schema=False)
+async def get_metrics() -> Response:
+    """Return application metrics of all workers in the Prometheus text exposition format."""
+    update_process_metrics()
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
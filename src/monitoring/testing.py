@@ -0,0 +1,67 @@
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.database import engine as default_engine
+from .db import statement_shape
+from .debug import find_repeated_statements
+
+
+@dataclass
+class QueryLog:
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def shapes(self) -> Counter:
+        return Counter(statement_shape(statement) for statement in self.statements)
+
+    def report(self) -> str:
+        repeated = find_repeated_statements(self.shapes, threshold=2)
+        lines = [f'{self.count} statements executed']
+        lines += [f'  {count}x {shape}' for shape, count in repeated]
+        return '\n'.join(lines)
+
+
+@contextmanager
+def capture_queries(engine: Engine = default_engine) -> Iterator[QueryLog]:
+    """
+    Record every statement executed by the engine inside the block, regardless of the thread
+    (TestClient runs the application in a separate thread).
+    """
+    log = QueryLog()
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+
+    event.listen(engine, 'after_cursor_execute', listener)
+    try:
+        yield log
+    finally:
+        event.remove(engine, 'after_cursor_execute', listener)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, engine: Engine = default_engine) -> Iterator[QueryLog]:
+    """
+    Fail if the block executes more than max_queries statements, e.g.
+
+        with assert_max_queries(5):
+            client.get('/directions/1/maps/unload')
+    """
+    with capture_queries(engine) as log:
+        yield log
+    assert log.count <= max_queries, f'Expected at most {max_queries} statements.\n{log.report()}'
+
+
+def assert_route_max_queries(
+        client, method: str, url: str, max_queries: int, engine: Engine = default_engine, **kwargs
+):
+    """Call the route with the test client and fail if it executes more than max_queries statements."""
+    with assert_max_queries(max_queries, engine):
+        return client.request(method, url, **kwargs)
@@ -0,0 +1,123 @@
+import os
+import time
+import orjson
+from dataclasses import dataclass
+from threading import Lock
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.activity_types.model import ActivityType
+from src.activity_types.schemas import ActivityTypeRead
+from src.competency_groups.model import CompetencyGroup
+from src.competency_groups.schemas import CompetencyGroupRead
+from src.control_types.model import ControlType
+from src.control_types.schemas import ControlTypeRead
+from src.departments.model import Department
+from src.departments.schemas import DepartmentRead
+from src.educational_forms.model import EducationalForm
+from src.educational_forms.schemas import EducationalFormRead
+from src.educational_levels.model import EducationalLevel
+from src.educational_levels.schemas import EducationalLevelRead
+
+# справочники, которые почти не меняются и целиком хранятся в памяти процесса
+REFERENCE_MODELS: dict[type, type[BaseModel]] = {
+    ControlType: ControlTypeRead,
+    EducationalLevel: EducationalLevelRead,
+    EducationalForm: EducationalFormRead,
+    ActivityType: ActivityTypeRead,
+    Department: DepartmentRead,
+    CompetencyGroup: CompetencyGroupRead,
+}
+
+# изменения, сделанные другими процессами, будут подхвачены не позже, чем через это время;
+# записи, которых еще нет в снимке, читаются из БД сразу
+REFERENCE_DATA_TTL = float(os.getenv('REFERENCE_DATA_TTL', '60'))
+
+
+@dataclass(frozen=True)
+class ReferenceTable:
+    items: tuple[BaseModel, ...]
+    by_id: dict[int, BaseModel]
+    id_by_name: dict[str, int]
+    # готовое тело ответа для списка, чтобы не сериализовать справочник на каждый запрос
+    items_json: bytes
+    loaded_at: float
+
+
+class ReferenceDataSnapshot:
+    """Снимок справочных таблиц: словари id -> объект и наименование -> id."""
+
+    def __init__(self, ttl: float = REFERENCE_DATA_TTL):
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self._tables: dict[type, ReferenceTable] = {}
+        self._generation: int = 0
+        self._lock: Lock = Lock()
+
+    def load(self, session: Session) -> None:
+        for model in REFERENCE_MODELS:
+            self._load_table(session, model)
+
+    def invalidate(self, model: type | None = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if model is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(model, None)
+
+    def list(self, session: Session, model: type) -> list[BaseModel]:
+        return list(self._get_table(session, model).items)
+
+    def list_json(self, session: Session, model: type) -> bytes:
+        return self._get_table(session, model).items_json
+
+    def get(self, session: Session, model: type, _id: int | None) -> BaseModel | None:
+        item = self._get_table(session, model).by_id.get(_id)
+        if item is not None or _id is None:
+            return item
+        # запись могла быть создана другим процессом после загрузки снимка
+        row = session.get(model, _id)
+        if row is None:
+            return None
+        self.invalidate(model)
+        return REFERENCE_MODELS[model].model_validate(row, from_attributes=True)
+
+    def get_id_by_name(self, session: Session, model: type, name: str) -> int | None:
+        _id = self._get_table(session, model).id_by_name.get(name)
+        if _id is not None:
+            return _id
+        _id = session.execute(select(model.id).where(model.name == name)).scalar()
+        if _id is not None:
+            self.invalidate(model)
+        return _id
+
+    def _get_table(self, session: Session, model: type) -> ReferenceTable:
+        table = self._tables.get(model)
+        if table is None or time.monotonic() - table.loaded_at > self.ttl:
+            self.misses += 1
+            return self._load_table(session, model)
+        self.hits += 1
+        return table
+
+    def _load_table(self, session: Session, model: type) -> ReferenceTable:
+        schema = REFERENCE_MODELS[model]
+        generation = self._generation
+        rows = session.execute(select(model).order_by(model.id)).scalars()
+        items = tuple(schema.model_validate(row, from_attributes=True) for row in rows)
+        table = ReferenceTable(
+            items=items,
+            by_id={item.id: item for item in items},
+            id_by_name={item.name: item.id for item in items},
+            items_json=orjson.dumps([item.model_dump(mode='json') for item in items]),
+            loaded_at=time.monotonic()
+        )
+        # если справочник был сброшен во время чтения, прочитанные данные могут быть устаревшими
+        with self._lock:
+            if generation == self._generation:
+                self._tables[model] = table
+        return table
+
+
+reference_data = ReferenceDataSnapshot()
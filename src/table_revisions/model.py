@@ -0,0 +1,11 @@
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.core.base_model import Base
+
+
+class TableRevision(Base):
+    """Счетчики изменений таблиц каталогов, по которым кэши отчетов определяют, что данные устарели."""
+    __tablename__ = 'table_revisions'
+
+    table_name: Mapped[str] = mapped_column(String(63), primary_key=True)
+    revision: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,33 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from .model import TableRevision
+
+
+def _revision_name(model: type | str) -> str:
+    # кроме таблиц счетчики ведутся для данных из нескольких таблиц, например для всех планов
+    return model if isinstance(model, str) else model.__tablename__
+
+
+def table_revision(model: type | str):
+    """
+    Return a scalar subquery with the revision of the model's table or of a named counter (0 if it was never bumped);
+    a primary key lookup, so it costs the same regardless of the table size.
+    """
+    return select(func.coalesce(func.max(TableRevision.revision), 0)).where(
+        TableRevision.table_name == _revision_name(model)
+    ).scalar_subquery()
+
+
+def bump_table_revision(session: Session, *models: type | str) -> None:
+    """
+    Increment the revisions of the models' tables or of named counters within the current transaction;
+    must be called by every route that inserts, updates or deletes rows of a table whose revision is read.
+    """
+    table_names = dict.fromkeys(_revision_name(model) for model in models)
+    stmt = insert(TableRevision).values([{'table_name': table_name, 'revision': 1} for table_name in table_names])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TableRevision.table_name],
+        set_={'revision': TableRevision.revision + 1}
+    )
+    session.execute(stmt)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import Response
+from typing import Annotated, Literal
+from src.dependencies import TeachingLoadServiceDep
+from .schemas import TeachingLoadReport
+
+router = APIRouter(
+    tags=['teaching load']
+)
+
+
+@router.get(
+    '/reports/teaching-load',
+    responses={
+        200: {
+            'description': 'Teaching load report successfully received',
+            'content': {'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': {}}
+        }
+    },
+    summary='Return the teaching load of departments across all directions'
+)
+def get_teaching_load(
+        teaching_load_service: TeachingLoadServiceDep,
+        department_id: Annotated[list[int] | None, Query()] = None,
+        format: Annotated[Literal['json', 'xlsx'], Query()] = 'json'
+) -> TeachingLoadReport:
+    """
+    Return lecture, practice and lab hours of discipline blocks of all direction plans
+    grouped by department, educational level, educational form and semester, or the same report as an Excel file
+    """
+    if format == 'xlsx':
+        return Response(
+            content=teaching_load_service.export_report_excel(department_id),
+            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            headers={
+                'Content-Disposition': 'attachment; filename="teaching_load.xlsx"',
+                'Access-Control-Expose-Headers': 'Content-Disposition',
+            }
+        )
+    return teaching_load_service.get_report(department_id)
@@ -0,0 +1,23 @@
+from typing import Annotated
+from pydantic import BaseModel, Field
+
+
+class TeachingLoadRow(BaseModel):
+    department_id: Annotated[int, Field(example=1)]
+    department_name: Annotated[str, Field(example='Кафедра информационных систем')]
+    educational_level_id: Annotated[int, Field(example=1)]
+    educational_level_name: Annotated[str, Field(example='Бакалавриат')]
+    educational_form_id: Annotated[int, Field(example=1)]
+    educational_form_name: Annotated[str, Field(example='Очная')]
+    semester_number: Annotated[int, Field(example=3)]
+    directions_count: Annotated[int, Field(example=4)]
+    discipline_blocks_count: Annotated[int, Field(example=9)]
+    lecture_hours: Annotated[int, Field(example=144)]
+    practice_hours: Annotated[int, Field(example=180)]
+    lab_hours: Annotated[int, Field(example=72)]
+    total_hours: Annotated[int, Field(example=396)]
+
+
+class TeachingLoadReport(BaseModel):
+    revision: Annotated[str, Field(example='9e107d9d372bb6826bd81d3542a419d6')]
+    rows: list[TeachingLoadRow]
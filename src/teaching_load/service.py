@@ -0,0 +1,133 @@
+import hashlib
+from io import BytesIO
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from src.core.cache import RevisionCache
+from src.departments.model import Department
+from src.direction_map_cors.model import DirectionMapCore
+from src.directions.model import Direction
+from src.discipline_blocks.model import DisciplineBlock
+from src.disciplines.model import Discipline
+from src.educational_forms.model import EducationalForm
+from src.educational_levels.model import EducationalLevel
+from src.maps.revisions import global_plan_revision
+from src.table_revisions.revisions import table_revision
+from .schemas import TeachingLoadReport, TeachingLoadRow
+
+# полный отчет один на все направления, в кэше хранится только его версия для текущей ревизии;
+# Excel собирается по выбранным кафедрам, поэтому хранятся несколько последних наборов
+report_cache = RevisionCache('teaching_load', max_size=1)
+report_excel_cache = RevisionCache('teaching_load_excel', max_size=16)
+
+
+class TeachingLoadService:
+    def __init__(self, session: Session):
+        self.session: Session = session
+
+    def get_report(self, department_ids: list[int] | None = None) -> TeachingLoadReport:
+        return self._filter_report(self._get_full_report(), department_ids)
+
+    def export_report_excel(self, department_ids: list[int] | None = None) -> bytes:
+        revision = self._get_revision()
+        key = tuple(sorted(set(department_ids))) if department_ids else None
+        return report_excel_cache.get_or_set(
+            key, revision, lambda: self._build_excel(self._filter_report(self._get_full_report(revision), key))
+        )
+
+    @staticmethod
+    def _filter_report(report: TeachingLoadReport, department_ids) -> TeachingLoadReport:
+        if not department_ids:
+            return report
+        department_ids = set(department_ids)
+        return TeachingLoadReport(
+            revision=report.revision,
+            rows=[row for row in report.rows if row.department_id in department_ids]
+        )
+
+    def _get_full_report(self, revision: str | None = None) -> TeachingLoadReport:
+        revision = revision or self._get_revision()
+        return report_cache.get_or_set(None, revision, lambda: self._build_report(revision))
+
+    def _get_revision(self) -> str:
+        # кроме планов отчет зависит от кафедр дисциплин, форм и уровней направлений и наименований в справочниках;
+        # ревизии этих таблиц увеличиваются их CRUD-роутами и читаются по первичному ключу одним запросом
+        stmt = select(
+            global_plan_revision(),
+            table_revision(Direction),
+            table_revision(Discipline),
+            table_revision(Department),
+            table_revision(EducationalLevel),
+            table_revision(EducationalForm)
+        )
+        revision = ':'.join(str(value) for value in self.session.execute(stmt).one())
+        return hashlib.md5(revision.encode()).hexdigest()
+
+    def _build_report(self, revision: str) -> TeachingLoadReport:
+        # часы блоков суммируются по каждому направлению, в план которого входит ядро
+        stmt = (
+            select(
+                Department.id,
+                Department.name,
+                EducationalLevel.id,
+                EducationalLevel.name,
+                EducationalForm.id,
+                EducationalForm.name,
+                DisciplineBlock.semester_number,
+                func.count(Direction.id.distinct()),
+                func.count(DisciplineBlock.id),
+                func.sum(DisciplineBlock.lecture_hours),
+                func.sum(DisciplineBlock.practice_hours),
+                func.sum(DisciplineBlock.lab_hours)
+            )
+            .select_from(DirectionMapCore)
+            .join(Direction, Direction.id == DirectionMapCore.direction_id)
+            .join(EducationalLevel, EducationalLevel.id == Direction.educational_level_id)
+            .join(EducationalForm, EducationalForm.id == Direction.educational_form_id)
+            .join(DisciplineBlock, DisciplineBlock.map_core_id == DirectionMapCore.map_core_id)
+            .join(Discipline, Discipline.id == DisciplineBlock.discipline_id)
+            .join(Department, Department.id == Discipline.department_id)
+            .group_by(Department.id, EducationalLevel.id, EducationalForm.id, DisciplineBlock.semester_number)
+            .order_by(Department.name, EducationalLevel.name, EducationalForm.name, DisciplineBlock.semester_number)
+        )
+
+        rows = []
+        for row in self.session.execute(stmt):
+            lecture_hours, practice_hours, lab_hours = row[9], row[10], row[11]
+            rows.append(TeachingLoadRow(
+                department_id=row[0],
+                department_name=row[1],
+                educational_level_id=row[2],
+                educational_level_name=row[3],
+                educational_form_id=row[4],
+                educational_form_name=row[5],
+                semester_number=row[6],
+                directions_count=row[7],
+                discipline_blocks_count=row[8],
+                lecture_hours=lecture_hours,
+                practice_hours=practice_hours,
+                lab_hours=lab_hours,
+                total_hours=lecture_hours + practice_hours + lab_hours
+            ))
+        return TeachingLoadReport(revision=revision, rows=rows)
+
+    @staticmethod
+    def _build_excel(report: TeachingLoadReport) -> bytes:
+        # openpyxl нужен только экспорту, поэтому не импортируется при старте приложения
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Нагрузка кафедр')
+        ws.append([
+            'Кафедра', 'Уровень образования', 'Форма обучения', 'Семестр', 'Направлений', 'Блоков дисциплин',
+            'Лекции', 'Практики', 'Лабораторные', 'Всего часов'
+        ])
+        for row in report.rows:
+            ws.append([
+                row.department_name, row.educational_level_name, row.educational_form_name, row.semester_number,
+                row.directions_count, row.discipline_blocks_count,
+                row.lecture_hours, row.practice_hours, row.lab_hours, row.total_hours
+            ])
+
+        output = BytesIO()
+        wb.save(output)
+        return output.getvalue()
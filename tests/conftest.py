@@ -0,0 +1,25 @@
+import pytest
+
+# тесты, которым нужна БД, выполняются на базе из DATABASE_URL (с примененными миграциями);
+# наборы данных создаются с уникальными именами, поэтому базу не нужно очищать между запусками
+
+
+@pytest.fixture(scope='session')
+def client():
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope='session')
+def seeded_data():
+    from benchmarks.generator import GeneratorConfig, seed_database
+    from src.database import SessionLocal
+
+    config = GeneratorConfig(
+        directions=1, map_cors_per_direction=2, blocks_per_map_core=10, disciplines=30, competencies=10
+    )
+    with SessionLocal() as session:
+        return seed_database(session, config)
@@ -0,0 +1,28 @@
+import os
+import pytest
+from benchmarks.importtime import IMPORT_BUDGETS_MS, LAZY_MODULES, best_of, check_budgets, measure_import
+
+# лучший из нескольких холодных импортов, чтобы единичный медленный запуск не ронял тест
+REPEAT = 3
+
+
+@pytest.fixture(scope='module')
+def timings():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # при импорте engine только создается, подключения к БД нет, поэтому подойдет любой адрес
+        monkeypatch.setenv('DATABASE_URL', os.getenv('DATABASE_URL') or 'postgresql://localhost/importtime')
+        return best_of([measure_import('src.main') for _ in range(REPEAT)])
+
+
+def test_budgeted_modules_are_measured(timings):
+    assert set(IMPORT_BUDGETS_MS) <= set(timings)
+
+
+def test_import_time_is_within_budgets(timings):
+    violations = check_budgets(timings, lazy_modules=())
+    assert not violations, '\n'.join(violations)
+
+
+@pytest.mark.parametrize('module', LAZY_MODULES)
+def test_lazy_module_is_not_imported_at_startup(timings, module):
+    assert not check_budgets(timings, budgets={}, lazy_modules=(module,))
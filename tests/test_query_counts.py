@@ -0,0 +1,33 @@
+import os
+import pytest
+
+if not os.getenv('DATABASE_URL'):
+    pytest.skip('DATABASE_URL is not set', allow_module_level=True)
+
+from src.monitoring.testing import assert_route_max_queries  # noqa: E402
+
+
+def test_unload_map_reads_snapshot(client, seeded_data):
+    direction_id = seeded_data.direction_ids[0]
+    url = f'/directions/{direction_id}/maps/unload'
+    # первая выгрузка собирает снимок плана, следующие читают его одним запросом
+    assert client.get(url).status_code == 200
+
+    response = assert_route_max_queries(client, 'GET', url, 1)
+    assert response.status_code == 200
+    assert len(response.json()['map_cors']) == 2
+
+
+def test_unload_map_core_queries_do_not_depend_on_blocks(client, seeded_data):
+    map_core_id = client.get(f'/directions/{seeded_data.direction_ids[0]}/maps/unload').json()['map_cors'][0]['id']
+
+    response = assert_route_max_queries(client, 'GET', f'/map-cors/{map_core_id}/unload', 3)
+    assert response.status_code == 200
+    assert len(response.json()['discipline_blocks']) == 10
+
+
+def test_reference_list_is_served_from_memory(client, seeded_data):
+    assert client.get('/departments').status_code == 200
+
+    response = assert_route_max_queries(client, 'GET', '/departments', 0)
+    assert response.status_code == 200